@@ -0,0 +1,118 @@
+# account_source.py
+import json
+import os
+
+LOCAL_CONFIG_DIR = "configs"
+CHUNK_SIZE = 64 * 1024
+
+# zone -> (mtime_ns, size, AccountIndex)
+_index_cache = {}
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array one by one, reading the
+    file in chunks instead of loading it whole.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof, opened = "", 0, False, False
+
+        while True:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"{path}: unterminated JSON array")
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+                continue
+
+            if not opened:
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array")
+                opened = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # A value ending right at the buffer edge may be cut short
+                complete = end < len(buffer) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                more = f.read(chunk_size)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+
+            yield item
+            pos = end
+
+
+def _valid_account(entry) -> bool:
+    if not isinstance(entry, dict):
+        return False
+    uid, password = entry.get("uid"), entry.get("password")
+    return bool(str(uid or "").strip().isdigit()) and isinstance(password, str) and bool(password)
+
+
+class AccountIndex:
+    """Validated, uid-deduplicated accounts of one zone, in file order."""
+
+    __slots__ = ("zone", "accounts", "by_uid", "skipped_invalid", "skipped_duplicate")
+
+    def __init__(self, zone: str, entries):
+        self.zone = zone
+        self.accounts = []
+        self.by_uid = {}
+        self.skipped_invalid = 0
+        self.skipped_duplicate = 0
+
+        for entry in entries:
+            if not _valid_account(entry):
+                self.skipped_invalid += 1
+                continue
+            uid = str(entry["uid"]).strip()
+            if uid in self.by_uid:
+                self.skipped_duplicate += 1
+                continue
+            account = {"uid": uid, "password": entry["password"]}
+            self.by_uid[uid] = account
+            self.accounts.append(account)
+
+    def __len__(self):
+        return len(self.accounts)
+
+
+def get_account_index(zone: str, config_dir: str = LOCAL_CONFIG_DIR):
+    """
+    AccountIndex for configs/config_{zone}.json, re-parsed only when the
+    file's mtime or size changed. Returns None if the file is missing.
+    Blocking; run it in a thread from async code.
+    """
+    path = os.path.join(config_dir, f"config_{zone}.json")
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _index_cache.pop(zone, None)
+        return None
+
+    cached = _index_cache.get(zone)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    index = AccountIndex(zone, iter_json_array(path))
+    if index.skipped_invalid or index.skipped_duplicate:
+        print(
+            f"⚠️ {path}: skipped {index.skipped_invalid} invalid and "
+            f"{index.skipped_duplicate} duplicate account(s)"
+        )
+    _index_cache[zone] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
@@ -2,35 +2,20 @@ import discord
 from discord.ext import commands, tasks
 import os
 import traceback
-from flask import Flask
-import threading
 import sys
-import aiohttp
 
 from dotenv import load_dotenv
-from token_manager import check_and_refresh_on_startup, check_token_validity
+from token_manager import start_token_supervisor, stop_token_supervisor
+import persistence
+from http_client import create_session, close_session
+from notifier import notifier
+import metrics
+import diagnostics
+from health_server import HealthServer
+from command_sync import sync_command_tree
+from bot_options import build_bot_options, SHARDING
 import asyncio
 
-app = Flask(__name__)
-bot_name = "None"
-
-@app.route('/')
-def home():
-    return f"Bot {bot_name} is active"
-
-
-def run_flask():
-    port = int(os.environ.get("PORT", 10000))
-    if os.name == 'nt':
-        from waitress import serve
-        serve(app, host="0.0.0.0", port=port)
-    else:
-        app.run(host='0.0.0.0', port=port)
-
-
-flask_thread = threading.Thread(target=run_flask, daemon=True)
-flask_thread.start()
-
 if os.path.exists(".env"):
     load_dotenv()
 
@@ -41,16 +26,37 @@ if not TOKEN:
 extensions = [
     "cogs.likeCommands"
 ]
+# Cog names reported by /healthz
+expected_cogs = [
+    "LikeCommands"
+]
+if diagnostics.DIAGNOSTICS:
+    extensions.append("cogs.diagnosticsCommands")
+    expected_cogs.append("DiagnosticsCommands")
 
 
-class Seemu(commands.Bot):
+# One gateway connection, or one per shard when SHARDING=1
+BotBase = commands.AutoShardedBot if SHARDING else commands.Bot
+
+
+class Seemu(BotBase):
     def __init__(self, command_prefix: str, intents: discord.Intents, **kwargs):
         super().__init__(command_prefix=command_prefix, intents=intents, **kwargs)
         self.session = None
         self.initialized = False
+        self.loop_lag_task = None
+        self.watchdog = None
+        self.health_server = HealthServer(self, expected_cogs)
 
     async def setup_hook(self) -> None:
-        self.session = aiohttp.ClientSession()
+        # Up first so /readyz can report 503 while we finish starting
+        await self.health_server.start()
+        self.session = create_session()
+        notifier.start(self.session)
+        self.loop_lag_task = asyncio.create_task(metrics.monitor_loop_lag())
+        if diagnostics.DIAGNOSTICS:
+            self.watchdog = diagnostics.LoopWatchdog()
+            self.watchdog.start()
 
         for ext in extensions:
             try:
@@ -60,26 +66,32 @@ class Seemu(commands.Bot):
                 print(f"❌ Failed to load {ext}: {e}")
                 traceback.print_exc()
 
-        await self.tree.sync()
+        try:
+            await sync_command_tree(self.tree)
+        except Exception as e:
+            print(f"⚠️ Command sync failed: {e}")
+            traceback.print_exc()
         print("✔ All cogs loaded")
         self.initialized = True
         self.update_activity_task.start()
 
     async def on_ready(self):
-        global bot_name
         if not self.initialized:
             return
 
         server_count = len(self.guilds)
         activity = discord.Game(name=f"Sharing likes on {server_count} servers")
         await self.change_presence(activity=activity)
-        bot_name = f"{self.user}"
 
-        
-        await check_and_refresh_on_startup(self.session)
+        # Token checks run in the background; on_ready may fire again on reconnect
+        start_token_supervisor(self.session)
 
-       
-        asyncio.create_task(check_token_validity(self.session))
+    async def on_shard_ready(self, shard_id: int):
+        # Only dispatched when sharded: set presence as each shard comes up
+        server_count = len(self.guilds)
+        activity = discord.Game(name=f"Sharing likes on {server_count} servers")
+        await self.change_presence(activity=activity, shard_id=shard_id)
+        print(f"✅ Shard {shard_id} ready ({sum(1 for g in self.guilds if g.shard_id == shard_id)} servers)")
 
     @tasks.loop(minutes=5)
     async def update_activity_task(self):
@@ -98,8 +110,16 @@ class Seemu(commands.Bot):
         print("Bot ready, starting activity update loop.")
 
     async def close(self):
-        if self.session:
-            await self.session.close()
+        # Flush write-behind stores before anything else can fail
+        await asyncio.to_thread(persistence.flush_all)
+        await stop_token_supervisor()
+        await notifier.stop()
+        if self.loop_lag_task:
+            self.loop_lag_task.cancel()
+        if self.watchdog:
+            self.watchdog.stop()
+        await close_session(self.session)
+        await self.health_server.stop()
         await super().close()
 
     @commands.Cog.listener()
@@ -130,8 +150,7 @@ class Seemu(commands.Bot):
 
 if __name__ == "__main__":
     try:
-        intents = discord.Intents.all()
-        bot = Seemu(command_prefix="!", intents=intents)
+        bot = Seemu(command_prefix="!", **build_bot_options())
         bot.run(TOKEN)
     except discord.errors.LoginFailure:
         print("❌ Invalid Discord token")
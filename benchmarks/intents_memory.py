@@ -0,0 +1,107 @@
+# benchmarks/intents_memory.py
+"""
+Memory used by the gateway caches for a given number of guilds, with
+INTENTS_MODE=all versus minimal.
+
+Feeds synthetic GUILD_CREATE payloads into a client's connection state (no
+network) and measures allocations with tracemalloc.
+
+    python -m benchmarks.intents_memory --guilds 10 100 1000 --members 200
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+from bot_options import build_bot_options  # noqa: E402
+
+_snowflake = 100_000_000_000_000_000
+
+
+def _next_id():
+    global _snowflake
+    _snowflake += 1
+    return str(_snowflake)
+
+
+def guild_payload(members: int, channels: int = 20, roles: int = 15) -> dict:
+    guild_id = _next_id()
+    role_ids = [_next_id() for _ in range(roles)]
+    return {
+        "id": guild_id,
+        "name": f"guild {guild_id}",
+        "owner_id": _next_id(),
+        "member_count": members,
+        "large": members > 250,
+        "roles": [
+            {"id": guild_id, "name": "@everyone", "permissions": "0", "position": 0}
+        ] + [
+            {"id": rid, "name": f"role {i}", "permissions": "0", "position": i + 1}
+            for i, rid in enumerate(role_ids)
+        ],
+        "channels": [
+            {
+                "id": _next_id(), "type": 0, "name": f"channel-{i}", "position": i,
+                "permission_overwrites": [], "nsfw": False, "parent_id": None,
+            }
+            for i in range(channels)
+        ],
+        # Only sent/chunked when the members intent is on
+        "members": [
+            {
+                "user": {"id": _next_id(), "username": f"user{i}", "discriminator": "0", "avatar": None},
+                "roles": role_ids[: i % 3],
+                "joined_at": "2024-01-01T00:00:00+00:00",
+                # Always sent by the gateway; discord.py >= 2.3.2 reads "flags" unconditionally
+                "flags": 0,
+                "deaf": False,
+                "mute": False,
+            }
+            for i in range(members)
+        ],
+    }
+
+
+def measure(mode: str, guilds: int, members: int) -> int:
+    options = build_bot_options(mode, sharding=False)
+    if not options["intents"].members:
+        members = 0  # the gateway won't send member lists without the intent
+    payloads = [guild_payload(members) for _ in range(guilds)]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    client = discord.Client(**options)
+    state = client._connection
+    for payload in payloads:
+        state._add_guild_from_data(payload)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    del client, state, payloads
+    gc.collect()
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--members", type=int, default=200, help="members per guild")
+    args = parser.parse_args()
+
+    print(f"{'guilds':>8} {'all (MiB)':>12} {'minimal (MiB)':>14} {'saved':>8}")
+    for guilds in args.guilds:
+        full = measure("all", guilds, args.members)
+        minimal = measure("minimal", guilds, args.members)
+        saved = 1 - minimal / full if full else 0
+        print(f"{guilds:>8} {full / 2**20:>12.2f} {minimal / 2**20:>14.2f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# benchmarks/load_test.py
+"""
+Offline load test: drives LikeCommands.like_command at a target rate and
+times token_manager.refresh_zone, against the local stand-ins from
+benchmarks/stubs.py instead of the real like API, auth endpoint, GitHub and
+webhook. Runs in a scratch directory so no real state file is touched.
+
+Reports p50/p95/p99 latency, throughput, outcomes, event-loop lag and memory.
+
+    python -m benchmarks.load_test --rps 50 --duration 30
+    python -m benchmarks.load_test --rps 200 --like-latency 300 --like-errors 0.05 --like-rate-limit 100
+    python -m benchmarks.load_test --skip-like --zones br ind --accounts 110 --auth-rate 20
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stubs import ServiceProfile, StubServices  # noqa: E402
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest rank
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summary(values) -> str:
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    return (
+        f"p50 {percentile(values, 50) * 1000:.1f}ms  p95 {percentile(values, 95) * 1000:.1f}ms  "
+        f"p99 {percentile(values, 99) * 1000:.1f}ms  max {values[-1] * 1000:.1f}ms"
+    )
+
+
+class LoopLagSampler:
+    """Sleeps `interval` in a loop and records how late each wake-up is."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(loop.time() - start - self.interval, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+# =================== SYNTHETIC DISCORD OBJECTS ===================
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeContext:
+    """Just enough of commands.Context for the prefix-command path of /like."""
+
+    def __init__(self, guild, author, channel):
+        self.interaction = None
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+        self.replies = []
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.replies.append(embed.title if embed is not None else content)
+
+    def typing(self):
+        return _Typing()
+
+
+def fake_guild(guild_id: int):
+    guild = SimpleNamespace(id=guild_id, shard_id=0)
+    guild.get_member = lambda member_id: None
+
+    async def fetch_member(member_id):
+        return SimpleNamespace(id=member_id, get_role=lambda role_id: None)
+    guild.fetch_member = fetch_member
+    return guild
+
+
+def fake_author(user_id: int):
+    return SimpleNamespace(
+        id=user_id,
+        mention=f"<@{user_id}>",
+        display_avatar=SimpleNamespace(url="https://cdn.discordapp.com/embed/avatars/0.png"),
+        get_role=lambda role_id: None,
+    )
+
+
+# =================== SCENARIOS ===================
+async def run_like_load(session, args):
+    from cogs.likeCommands import LikeCommands
+
+    cog = LikeCommands(SimpleNamespace(session=session))
+    await cog.cog_load()
+
+    regions = args.regions
+    hot_uids = [str(random.randint(10**8, 10**9 - 1)) for _ in range(50)]
+    channel = SimpleNamespace(id=1)
+    guilds = [fake_guild(1000 + i) for i in range(args.guilds)]
+    latencies = []
+    outcomes = Counter()
+
+    async def one(i):
+        ctx = FakeContext(guilds[i % len(guilds)], fake_author(10**6 + i), channel)
+        uid = random.choice(hot_uids) if random.random() < args.repeat else str(random.randint(10**8, 10**9 - 1))
+        t0 = time.perf_counter()
+        await cog.like_command.callback(cog, ctx, random.choice(regions), uid)
+        latencies.append(time.perf_counter() - t0)
+        outcomes[(ctx.replies[-1] or "")[:40] if ctx.replies else "(no reply)"] += 1
+
+    loop = asyncio.get_running_loop()
+    total = int(args.rps * args.duration)
+    tasks = []
+    started = loop.time()
+    for i in range(total):
+        # Open loop: fire on schedule whether or not earlier requests finished
+        delay = started + i / args.rps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+
+    stats = cog.like_api.stats()
+    await cog.cog_unload()
+    return {
+        "requests": total,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latencies": latencies,
+        "outcomes": outcomes,
+        "like_api": stats,
+    }
+
+
+def write_accounts(zone: str, count: int):
+    os.makedirs("configs", exist_ok=True)
+    accounts = [{"uid": str(4_000_000_000 + i), "password": f"pw{i:06d}"} for i in range(count)]
+    with open(os.path.join("configs", f"config_{zone}.json"), "w") as f:
+        json.dump(accounts, f)
+
+
+async def run_token_refresh(session, args):
+    import token_manager
+
+    results = {}
+    for zone in args.zones:
+        write_accounts(zone, args.accounts)
+        runs = []
+        for _ in range(args.refresh_runs):
+            t0 = time.perf_counter()
+            ok = await token_manager.refresh_zone(session, zone)
+            runs.append((time.perf_counter() - t0, ok))
+        results[zone] = runs
+    return results
+
+
+# =================== MAIN ===================
+def configure_env(base_url: str, args):
+    # Must happen before the bot modules are imported: they read env at import time
+    os.environ.update({
+        "API_URL": base_url,
+        "AUTH_URL": f"{base_url}/auth",
+        "GITHUB_API": base_url,
+        "GITHUB_TOKEN": "bench",
+        "REPO_TOKENS": "bench/tokens",
+        "WEEBOOK_URL": f"{base_url}/webhook",
+        "STATE_BACKEND": args.state_backend,
+    })
+    if args.auth_rate:
+        os.environ["AUTH_RATE_PER_SEC"] = str(args.auth_rate)
+    # The per-region upstream budget would otherwise cap the offered load
+    os.environ["LIKE_REGION_RATE"] = str(args.region_rate)
+
+
+async def main(args):
+    stubs = StubServices(
+        like=ServiceProfile(args.like_latency, args.like_jitter, args.like_errors, args.like_rate_limit),
+        auth=ServiceProfile(args.auth_latency, args.auth_latency / 4, args.auth_errors, args.auth_rate_limit),
+        github=ServiceProfile(args.github_latency, args.github_latency / 4, args.github_errors, args.github_rate_limit),
+        webhook=ServiceProfile(args.webhook_latency, args.webhook_latency / 4, 0.0, args.webhook_rate_limit),
+        not_found_rate=args.not_found_rate,
+        max_likes_rate=args.max_likes_rate,
+    )
+    base_url = await stubs.start()
+    configure_env(base_url, args)
+    print(f"Stand-ins listening on {base_url}")
+
+    from http_client import create_session, close_session
+    from notifier import notifier
+    import persistence
+
+    session = create_session()
+    notifier.start(session)
+    sampler = LoopLagSampler()
+    sampler.start()
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    like = refresh = None
+    try:
+        if not args.skip_like:
+            like = await run_like_load(session, args)
+        if args.zones:
+            refresh = await run_token_refresh(session, args)
+    finally:
+        await sampler.stop()
+        await notifier.stop()
+        await asyncio.to_thread(persistence.flush_all)
+        await close_session(session)
+        await stubs.stop()
+
+    gc.collect()
+    print()
+    if like:
+        print(f"== /like: {like['requests']} requests at {args.rps:g} rps target ==")
+        print(f"throughput   {like['throughput']:.1f} req/s over {like['elapsed']:.1f}s")
+        print(f"latency      {summary(like['latencies'])}")
+        print(f"like api     {like['like_api']}")
+        for outcome, count in like["outcomes"].most_common():
+            print(f"  {count:>7}  {outcome}")
+    if refresh:
+        print(f"== refresh_zone: {args.accounts} accounts per zone ==")
+        for zone, runs in refresh.items():
+            times = ", ".join(f"{seconds:.2f}s{'' if ok else ' (failed)'}" for seconds, ok in runs)
+            print(f"  {zone:<5} {times}")
+    print("== stand-in calls ==")
+    for service, counts in stubs.calls.items():
+        print(f"  {service:<8} {dict(sorted(counts.items()))}")
+    print(f"loop lag     {summary(sampler.samples)}")
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"python heap  current {current / 1024 / 1024:.1f} MiB, peak {peak / 1024 / 1024:.1f} MiB")
+    # ru_maxrss is in KiB on Linux
+    print(f"max rss      {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    load = parser.add_argument_group("/like load")
+    load.add_argument("--rps", type=float, default=50)
+    load.add_argument("--duration", type=float, default=20, help="seconds of load")
+    load.add_argument("--guilds", type=int, default=20)
+    load.add_argument("--regions", nargs="+", default=["br", "ind", "bd"])
+    load.add_argument("--repeat", type=float, default=0.2, help="share of requests reusing a hot UID")
+    load.add_argument("--skip-like", action="store_true")
+    load.add_argument("--state-backend", default="json", choices=["json", "sqlite"])
+    load.add_argument("--region-rate", type=float, default=0, help="LIKE_REGION_RATE (0 = unlimited)")
+
+    refresh = parser.add_argument_group("token refresh")
+    refresh.add_argument("--zones", nargs="*", default=["br"], help="zones to refresh (none to skip)")
+    refresh.add_argument("--accounts", type=int, default=110)
+    refresh.add_argument("--refresh-runs", type=int, default=2)
+    refresh.add_argument("--auth-rate", type=float, default=0, help="override AUTH_RATE_PER_SEC")
+
+    stubs = parser.add_argument_group("stand-ins (latency in ms, rates in req/s, 0 = unlimited)")
+    stubs.add_argument("--like-latency", type=float, default=120)
+    stubs.add_argument("--like-jitter", type=float, default=60)
+    stubs.add_argument("--like-errors", type=float, default=0.0)
+    stubs.add_argument("--like-rate-limit", type=float, default=0)
+    stubs.add_argument("--not-found-rate", type=float, default=0.05)
+    stubs.add_argument("--max-likes-rate", type=float, default=0.1)
+    stubs.add_argument("--auth-latency", type=float, default=80)
+    stubs.add_argument("--auth-errors", type=float, default=0.0)
+    stubs.add_argument("--auth-rate-limit", type=float, default=0)
+    stubs.add_argument("--github-latency", type=float, default=150)
+    stubs.add_argument("--github-errors", type=float, default=0.0)
+    stubs.add_argument("--github-rate-limit", type=float, default=0)
+    stubs.add_argument("--webhook-latency", type=float, default=30)
+    stubs.add_argument("--webhook-rate-limit", type=float, default=0)
+
+    parser.add_argument("--tracemalloc", action="store_true", help="track Python heap (slower)")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    random.seed(args.seed)
+    # Scratch working dir: state files, configs/ and token_state/ stay out of the repo
+    with tempfile.TemporaryDirectory(prefix="seemu-bench-") as workdir:
+        os.chdir(workdir)
+        asyncio.run(main(args))
@@ -0,0 +1,189 @@
+# benchmarks/stubs.py
+"""
+Local aiohttp stand-ins for the services the bot talks to:
+
+    GET  /like?uid=&server=               like API (API_URL)
+    GET  /auth?uid=&password=             auth endpoint (AUTH_URL)
+    GET  /repos/{owner}/{repo}/contents/{path}   GitHub contents API
+    PUT  /repos/{owner}/{repo}/contents/{path}
+    GET  /repos/{owner}/{repo}/commits?path=     GitHub commits API (ETag aware)
+    POST /webhook                         Discord webhook (WEEBOOK_URL)
+
+Each service has a ServiceProfile with latency, jitter, error rate and an
+optional rate limit answered with 429 (like the real services).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+from base64 import b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+
+from rate_limit import TokenBucket  # noqa: E402
+
+
+@dataclass
+class ServiceProfile:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0        # share of 5xx answers
+    rate_limit: float = 0.0        # requests/second before 429s (0 = unlimited)
+
+    def __post_init__(self):
+        self._bucket = TokenBucket(self.rate_limit) if self.rate_limit > 0 else None
+
+    async def delay(self):
+        seconds = max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        await asyncio.sleep(seconds)
+
+    def rejection(self):
+        """A 429/5xx response to send instead of the real answer, or None."""
+        if self._bucket is not None and not self._bucket.try_acquire():
+            return web.json_response(
+                {"message": "rate limited"}, status=429,
+                headers={"Retry-After": "1", "X-RateLimit-Remaining": "0"},
+            )
+        if self.error_rate and random.random() < self.error_rate:
+            return web.json_response({"message": "upstream error"}, status=503)
+        return None
+
+
+def _fake_jwt(lifetime: int = 8 * 3600) -> str:
+    def part(obj):
+        return urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+    exp = int(datetime.now(timezone.utc).timestamp()) + lifetime
+    return f"{part({'alg': 'none'})}.{part({'exp': exp, 'n': random.getrandbits(32)})}.sig"
+
+
+def _blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class StubServices:
+    """All stand-ins on one local port, with per-service profiles and call counts."""
+
+    def __init__(self, like=None, auth=None, github=None, webhook=None,
+                 not_found_rate: float = 0.05, max_likes_rate: float = 0.1):
+        self.profiles = {
+            "like": like or ServiceProfile(),
+            "auth": auth or ServiceProfile(latency_ms=80),
+            "github": github or ServiceProfile(latency_ms=150, jitter_ms=50),
+            "webhook": webhook or ServiceProfile(latency_ms=30, jitter_ms=10),
+        }
+        self.not_found_rate = not_found_rate
+        self.max_likes_rate = max_likes_rate
+        self.calls = {name: {} for name in self.profiles}  # service -> {status: count}
+        self.files = {}                                  # repo path -> bytes
+        self.commit_dates = {}                           # repo path -> iso date
+        self._runner = None
+        self.base_url = None
+
+        self.app = web.Application(client_max_size=64 * 1024 * 1024)
+        self.app.add_routes([
+            web.get("/like", self.like),
+            web.get("/auth", self.auth),
+            web.get("/repos/{owner}/{repo}/contents/{path:.+}", self.contents_get),
+            web.put("/repos/{owner}/{repo}/contents/{path:.+}", self.contents_put),
+            web.get("/repos/{owner}/{repo}/commits", self.commits),
+            web.post("/webhook", self.webhook),
+        ])
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _answer(self, service, handler):
+        profile = self.profiles[service]
+        await profile.delay()
+        response = profile.rejection() or handler()
+        counts = self.calls[service]
+        counts[response.status] = counts.get(response.status, 0) + 1
+        return response
+
+    # =================== LIKE API ===================
+    async def like(self, request):
+        uid = request.query.get("uid", "")
+
+        def handler():
+            roll = random.random()
+            if roll < self.not_found_rate:
+                return web.json_response({"message": "player not found"}, status=404)
+            before = random.randint(0, 100_000)
+            if roll < self.not_found_rate + self.max_likes_rate:
+                return web.json_response({"status": 2, "player": f"P{uid[-4:]}", "likes_before": before})
+            return web.json_response({
+                "status": 1, "player": f"P{uid[-4:]}",
+                "likes_before": before, "likes_after": before + 100, "likes_added": 100,
+            })
+        return await self._answer("like", handler)
+
+    # =================== AUTH ===================
+    async def auth(self, request):
+        return await self._answer("auth", lambda: web.json_response({"token": _fake_jwt()}))
+
+    # =================== GITHUB ===================
+    def _github_headers(self):
+        return {"X-RateLimit-Remaining": "4999"}
+
+    async def contents_get(self, request):
+        path = request.match_info["path"]
+
+        def handler():
+            data = self.files.get(path)
+            if data is None:
+                return web.json_response({"message": "Not Found"}, status=404, headers=self._github_headers())
+            return web.json_response({"path": path, "sha": _blob_sha(data)}, headers=self._github_headers())
+        return await self._answer("github", handler)
+
+    async def contents_put(self, request):
+        path = request.match_info["path"]
+        body = await request.json()
+
+        def handler():
+            current = self.files.get(path)
+            if current is not None and body.get("sha") != _blob_sha(current):
+                return web.json_response({"message": "sha mismatch"}, status=409, headers=self._github_headers())
+            data = b64decode(body["content"])
+            self.files[path] = data
+            self.commit_dates[path] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            return web.json_response(
+                {"content": {"path": path, "sha": _blob_sha(data)}},
+                status=200 if current is not None else 201, headers=self._github_headers(),
+            )
+        return await self._answer("github", handler)
+
+    async def commits(self, request):
+        path = request.query.get("path", "")
+
+        def handler():
+            date = self.commit_dates.get(path)
+            if date is None:
+                return web.json_response([], headers=self._github_headers())
+            etag = f'"{hashlib.sha1(date.encode()).hexdigest()}"'
+            headers = {**self._github_headers(), "ETag": etag}
+            if request.headers.get("If-None-Match") == etag:
+                return web.Response(status=304, headers=headers)
+            return web.json_response([{"commit": {"committer": {"date": date}}}], headers=headers)
+        return await self._answer("github", handler)
+
+    # =================== WEBHOOK ===================
+    async def webhook(self, request):
+        await request.read()
+        return await self._answer("webhook", lambda: web.Response(status=204))
@@ -0,0 +1,58 @@
+# bot_options.py
+import os
+
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+# "minimal": only what the cogs need; "all": discord.Intents.all() with default caches
+INTENTS_MODE = os.getenv("INTENTS_MODE", "minimal").lower()
+# Message cache size in minimal mode (0 disables it; the cogs never read it)
+MAX_MESSAGES = int(os.getenv("MAX_MESSAGES", "0"))
+
+# SHARDING=1 runs as AutoShardedBot. SHARD_COUNT / SHARD_IDS ("0,1") pin the
+# layout for multi-process deployments; otherwise Discord's recommendation is used.
+SHARDING = os.getenv("SHARDING", "0") == "1"
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = os.getenv("SHARD_IDS")
+
+
+def build_intents(mode: str = INTENTS_MODE) -> discord.Intents:
+    if mode == "all":
+        return discord.Intents.all()
+    intents = discord.Intents.none()
+    intents.guilds = True            # guild/channel/role cache for checks and presence count
+    intents.guild_messages = True    # "!" prefix commands
+    intents.message_content = True   # prefix commands need the message text
+    return intents
+
+
+def build_shard_options() -> dict:
+    """shard_count/shard_ids for AutoShardedBot; empty means automatic."""
+    options = {}
+    if SHARD_COUNT:
+        options["shard_count"] = int(SHARD_COUNT)
+    if SHARD_IDS:
+        if "shard_count" not in options:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT")
+        options["shard_ids"] = [int(i) for i in SHARD_IDS.split(",") if i.strip()]
+    return options
+
+
+def build_bot_options(mode: str = INTENTS_MODE, sharding: bool = SHARDING) -> dict:
+    """Keyword arguments for the bot constructor: intents, matching cache settings and shards."""
+    options = build_shard_options() if sharding else {}
+    if mode == "all":
+        options["intents"] = build_intents(mode)
+        return options
+    if mode != "minimal":
+        print(f"⚠️ Unknown INTENTS_MODE '{mode}', using minimal")
+    options.update({
+        "intents": build_intents("minimal"),
+        # Members arrive with their roles on every interaction/message;
+        # anything else is fetched on demand (see LikeCommands.has_role)
+        "member_cache_flags": discord.MemberCacheFlags.none(),
+        "chunk_guilds_at_startup": False,
+        "max_messages": MAX_MESSAGES or None,
+    })
+    return options
@@ -0,0 +1,48 @@
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import threading
+from diagnostics import sample_profile, write_profile, top_frames, MAX_PROFILE_SECONDS
+
+
+class DiagnosticsCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.profiling = False
+
+    # =================== ADMIN COMMANDS ===================
+    @commands.hybrid_command(
+        name="profile", description="Sample the bot's event loop and save a profile."
+    )
+    @commands.has_permissions(administrator=True)
+    @app_commands.describe(seconds=f"How long to sample (1-{MAX_PROFILE_SECONDS} seconds)")
+    async def profile(self, ctx: commands.Context, seconds: int = 10):
+        if self.profiling:
+            return await ctx.send("⏳ A profile is already running.", ephemeral=True)
+
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+        self.profiling = True
+        try:
+            await ctx.defer(ephemeral=True)
+            # This coroutine runs on the loop thread, which is what we want to sample
+            loop_thread_id = threading.get_ident()
+            samples = await asyncio.to_thread(sample_profile, loop_thread_id, seconds)
+            path = await asyncio.to_thread(write_profile, samples)
+        finally:
+            self.profiling = False
+
+        total = sum(samples.values()) or 1
+        lines = [f"`{count * 100 / total:5.1f}%` {frame}" for frame, count in top_frames(samples)]
+        embed = discord.Embed(
+            title="🩺 Event loop profile",
+            description="\n".join(lines)[:4000] or "No samples.",
+            color=0x3498DB,
+        )
+        embed.set_footer(text=f"{total} samples over {seconds}s • saved to {path}")
+        await ctx.send(embed=embed, file=discord.File(path), ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(DiagnosticsCommands(bot))
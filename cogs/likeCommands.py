@@ -1,27 +1,49 @@
 
 import discord 
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-import aiohttp
 from datetime import datetime
-import json
 import os
+import time
 import asyncio
+import math
+import re
 from dotenv import load_dotenv
+from storage import open_state_store
+from guild_config import EMPTY_SETTINGS
+from quota import QuotaEngine, QuotaExceeded
+from like_api import LikeAPIClient
+from dispatcher import LikeDispatcher, QueueFullError
+from token_manager import ZONES
+import metrics
+from embeds import templates_for
 
 load_dotenv()
 API_URL = os.getenv("API_URL")
-CONFIG_FILE = "like_channels.json"
-DAILY_FILE = "daily_usage.json"
+# /likebatch: UIDs per run, concurrent upstream calls per run, seconds between message edits
+BATCH_MAX_UIDS = int(os.getenv("LIKE_BATCH_MAX", "50"))
+BATCH_CONCURRENCY = int(os.getenv("LIKE_BATCH_CONCURRENCY", "5"))
+BATCH_EDIT_INTERVAL = 1.5
+# /like time budgets (seconds) per stage: role lookup, dispatch queue wait, upstream call
+CHECK_BUDGET = float(os.getenv("LIKE_CHECK_BUDGET", "3"))
+QUEUE_BUDGET = float(os.getenv("LIKE_QUEUE_BUDGET", "10"))
+UPSTREAM_BUDGET = float(os.getenv("LIKE_UPSTREAM_BUDGET", "12"))
+# Regions users may send likes to, e.g. "br,ind,bd,sg" (defaults to the token zones)
+LIKE_REGIONS = tuple(
+    r.strip().lower() for r in os.getenv("LIKE_REGIONS", ",".join(ZONES)).split(",") if r.strip()
+)
 
 class LikeCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.api_host = API_URL
-        self.config_data = self.load_config()
-        self.cooldowns = {}
-        self.session = aiohttp.ClientSession()
-        self.daily_usage = self.load_daily_usage()
+        self.store = open_state_store()
+        self.session = bot.session  # shared, owned and closed by the bot
+        self.like_api = LikeAPIClient(self.session, self.api_host)
+        # Only the allowed like regions get queues and budgets
+        self.dispatcher = LikeDispatcher(regions=LIKE_REGIONS)
+        self.quota = QuotaEngine(self.store, regions=LIKE_REGIONS)
+        metrics.LIKE_QUEUE_DEPTH.set_function(lambda: self.dispatcher.queue_depth)
 
     # =================== HELPER ===================
     async def send_temp(self, ctx, content=None, embed=None, ephemeral=False, delay=5):
@@ -31,80 +53,133 @@ class LikeCommands(commands.Cog):
         except Exception as e:
             print(f"[send_temp error] {e}")
 
-    # =================== CONFIG HANDLING ===================
-    def load_config(self):
-        default_config = {"servers": {}}
-        if os.path.exists(CONFIG_FILE):
+    async def respond(self, ctx, content=None, embed=None, temp=True, delay=5):
+        """
+        Reply to a command: edits the deferred response of a slash command,
+        sends a (temporary) message otherwise.
+        """
+        if ctx.interaction is not None and ctx.interaction.response.is_done():
             try:
-                with open(CONFIG_FILE, "r") as f:
-                    loaded_config = json.load(f)
-                    loaded_config.setdefault("servers", {})
-                    return loaded_config
-            except json.JSONDecodeError:
-                print(
-                    f"WARNING: The configuration file '{CONFIG_FILE}' is corrupt or empty. Resetting to default configuration."
-                )
-        self.save_config(default_config)
-        return default_config
-
-    def save_config(self, config_to_save=None):
-        data_to_save = config_to_save if config_to_save is not None else self.config_data
-        temp_file = CONFIG_FILE + ".tmp"
-        with open(temp_file, "w") as f:
-            json.dump(data_to_save, f, indent=4)
-        os.replace(temp_file, CONFIG_FILE)
-
-    # =================== DAILY LIMIT HANDLING ===================
-    def load_daily_usage(self):
-        if os.path.exists(DAILY_FILE):
+                message = await ctx.interaction.edit_original_response(content=content, embed=embed)
+                if temp:
+                    await message.delete(delay=delay)
+                return message
+            except discord.HTTPException as e:
+                print(f"[respond error] {e}")
+                return None
+        if temp:
+            return await self.send_temp(ctx, content=content, embed=embed, delay=delay)
+        return await ctx.send(content=content, embed=embed)
+
+    def templates(self, ctx):
+        """Embed templates for the guild's branding (built once per config version)."""
+        return templates_for(self.guild_settings(ctx))
+
+    # =================== QUOTA HANDLING ===================
+    async def _resolve_member(self, ctx):
+        """The author as a Member, without relying on a member cache."""
+        author = ctx.author
+        if isinstance(author, discord.Member):
+            return author
+        # Not resolved as a member (e.g. uncached): ask the API once
+        member = ctx.guild.get_member(author.id)
+        if member is None:
             try:
-                with open(DAILY_FILE, "r") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
-
-    def save_daily_usage(self):
-        with open(DAILY_FILE, "w") as f:
-            json.dump(self.daily_usage, f, indent=4)
-
-    async def check_daily_limit(self, ctx):
-        guild_id = str(ctx.guild.id)
-        premium_role_id = self.config_data["servers"].get(guild_id, {}).get("premium_role")
-
-        # ==== PREMIUM BYPASS ====
-        if premium_role_id and discord.utils.get(ctx.author.roles, id=int(premium_role_id)):
-            return True, None
-
-        user_id = str(ctx.author.id)
-        today = datetime.utcnow().date().isoformat()
+                member = await ctx.guild.fetch_member(author.id)
+            except discord.HTTPException:
+                return None
+        return member
 
-        if user_id not in self.daily_usage:
-            self.daily_usage[user_id] = {"last_reset": today, "used": 0}
+    async def has_role(self, ctx, role_id: int) -> bool:
+        member = await self._resolve_member(ctx)
+        return member is not None and member.get_role(role_id) is not None
 
-        # Reset if new day
-        if self.daily_usage[user_id]["last_reset"] != today:
-            self.daily_usage[user_id] = {"last_reset": today, "used": 0}
-
-        # Normal limit = 1
-        limit = 1
-        if self.daily_usage[user_id]["used"] >= limit:
-            return False, limit
+    async def is_premium(self, ctx) -> bool:
+        if ctx.guild is None:
+            return False
+        premium_role_id = self.guild_settings(ctx).premium_role
+        return premium_role_id is not None and await self.has_role(ctx, premium_role_id)
+
+    def guild_settings(self, ctx):
+        return self.store.get_guild_settings(str(ctx.guild.id)) if ctx.guild is not None else EMPTY_SETTINGS
+
+    async def member_role_ids(self, ctx, settings) -> frozenset:
+        """The author's role ids, looked up only when the guild has role-based quotas."""
+        if ctx.guild is None or (settings.premium_role is None and not settings.role_limits):
+            return frozenset()
+        member = await self._resolve_member(ctx)
+        return frozenset(role.id for role in member.roles) if member is not None else frozenset()
+
+    async def reserve_quota(self, ctx, region=None, count_daily=True):
+        """
+        Reserve cooldown, daily quota and upstream budget for the author, or
+        reply with the reason it's refused. Returns the Reservation or None.
+        """
+        settings = self.guild_settings(ctx)
+        try:
+            role_ids = await asyncio.wait_for(self.member_role_ids(ctx, settings), CHECK_BUDGET)
+        except asyncio.TimeoutError:
+            metrics.LIKE_REQUESTS.inc(outcome="timeout")
+            await self._send_error_embed(ctx, "Timeout", "Discord took too long to answer. Please try again.")
+            return None
 
-        self.daily_usage[user_id]["used"] += 1
-        self.save_daily_usage()
-        return True, None
+        try:
+            return self.quota.reserve(str(ctx.author.id), settings, role_ids, region, count_daily)
+        except QuotaExceeded as e:
+            metrics.LIKE_REJECTIONS.inc(reason=e.reason)
+            if e.reason == "daily_limit":
+                await self.respond(ctx, embed=self.templates(ctx).daily_limit(e.limit), delay=5)
+            elif e.reason == "cooldown":
+                await self.respond(ctx, f"Please wait {math.ceil(e.retry_after)} seconds before using this command again.")
+            else:
+                await self.respond(ctx, f"⏳ The {region.upper()} servers are busy right now. Please try again in a few seconds.")
+            return None
+
+    def refund_quota(self, reservation, outcome, upstream_reached=False):
+        self.quota.refund(reservation, upstream_reached)
+        metrics.LIKE_QUOTA_REFUNDS.inc(outcome=outcome)
+
+    # =================== REGION CHECK ===================
+    @staticmethod
+    def known_region(server) -> bool:
+        return server.lower() in LIKE_REGIONS
+
+    @staticmethod
+    def unknown_region_message(server) -> str:
+        return f"❌ Unknown server '{server[:10]}'. Available: {', '.join(r.upper() for r in LIKE_REGIONS)}."
 
     # =================== CHANNEL CHECK ===================
     async def check_channel(self, ctx):
         if ctx.guild is None:
             return True
         guild_id = str(ctx.guild.id)
-        like_channels = self.config_data["servers"].get(guild_id, {}).get("like_channels", [])
-        return not like_channels or str(ctx.channel.id) in like_channels
+        return self.store.get_guild_settings(guild_id).allows_channel(ctx.channel.id)
 
     async def cog_load(self):
-        pass
+        self.store.start()
+        self.dispatcher.start()
+        self.compact_state_task.start()
+
+    # =================== STATE COMPACTION ===================
+    @tasks.loop(minutes=10)
+    async def compact_state_task(self):
+        try:
+            self.like_api.prune()
+            self.quota.prune()
+            today = datetime.utcnow().date().toordinal()
+
+            def compact():
+                # Every configured guild counts, not just those seen since the restart
+                cutoff = time.time() - self.quota.cooldown_horizon()
+                return self.store.compact(today, cutoff)
+            usage, cooldowns, reclaimed = await asyncio.to_thread(compact)
+            if usage or cooldowns:
+                print(
+                    f"🧹 Compaction: {usage} daily usage and {cooldowns} cooldown entries evicted "
+                    f"(~{reclaimed / 1024:.1f} KiB reclaimed)"
+                )
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la compaction : {e}")
 
     # =================== ADMIN COMMANDS ===================
     @commands.hybrid_command(
@@ -117,18 +192,20 @@ class LikeCommands(commands.Cog):
             return await self.send_temp(ctx, "This command can only be used in a server.")
 
         guild_id = str(ctx.guild.id)
-        server_config = self.config_data["servers"].setdefault(guild_id, {})
-        like_channels = server_config.setdefault("like_channels", [])
+        server_config = dict(self.store.get_guild_config(guild_id))
+        like_channels = list(server_config.get("like_channels", []))
 
         channel_id_str = str(channel.id)
 
         if channel_id_str in like_channels:
             like_channels.remove(channel_id_str)
-            self.save_config()
+            server_config["like_channels"] = like_channels
+            self.store.set_guild_config(guild_id, server_config)
             await self.send_temp(ctx, f"✅ Channel {channel.mention} has been **removed**.")
         else:
             like_channels.append(channel_id_str)
-            self.save_config()
+            server_config["like_channels"] = like_channels
+            self.store.set_guild_config(guild_id, server_config)
             await self.send_temp(ctx, f"✅ Channel {channel.mention} is now **allowed**.")
 
     @commands.hybrid_command(
@@ -137,161 +214,296 @@ class LikeCommands(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_premium_role(self, ctx: commands.Context, role: discord.Role):
         guild_id = str(ctx.guild.id)
-        server_config = self.config_data["servers"].setdefault(guild_id, {})
+        server_config = dict(self.store.get_guild_config(guild_id))
         server_config["premium_role"] = str(role.id)
-        self.save_config()
+        self.store.set_guild_config(guild_id, server_config)
         await self.send_temp(ctx, f"✅ Premium role set to {role.mention}.")
 
+    @commands.hybrid_command(
+        name="setlikelimit", description="Set the daily /like limit for this server or for one role."
+    )
+    @commands.has_permissions(administrator=True)
+    @app_commands.describe(
+        limit="Likes per user per UTC day (0 = unlimited)",
+        role="Only for members of this role (their best role limit wins)",
+        cooldown="Seconds between two /like of the same user, for the whole server",
+    )
+    async def set_like_limit(self, ctx: commands.Context, limit: int, role: discord.Role = None, cooldown: int = None):
+        if ctx.guild is None:
+            return await self.send_temp(ctx, "This command can only be used in a server.")
+        if limit < 0 or (cooldown is not None and cooldown < 0):
+            return await self.send_temp(ctx, "❌ Limit and cooldown can't be negative.")
+
+        guild_id = str(ctx.guild.id)
+        server_config = dict(self.store.get_guild_config(guild_id))
+        shown = "unlimited" if limit == 0 else f"{limit} like(s)/day"
+        if role is None:
+            server_config["daily_limit"] = limit
+            msg = f"✅ Daily limit set to **{shown}**."
+        else:
+            role_limits = dict(server_config.get("role_limits", {}))
+            role_limits[str(role.id)] = limit
+            server_config["role_limits"] = role_limits
+            msg = f"✅ Daily limit for {role.mention} set to **{shown}**."
+        if cooldown is not None:
+            server_config["cooldown"] = cooldown
+            msg += f" Cooldown: **{cooldown}s**."
+        self.store.set_guild_config(guild_id, server_config)
+        await self.send_temp(ctx, msg)
+
     # =================== MAIN LIKE COMMAND ===================
     @commands.hybrid_command(name="like", description="Sends likes to a Free Fire player")
     @app_commands.describe(uid="Player UID (numbers only, minimum 6 characters)")
     async def like_command(self, ctx: commands.Context, server: str = None, uid: str = None):
         is_slash = ctx.interaction is not None
+        if is_slash:
+            # Acknowledge within Discord's 3s window; every reply below edits this response
+            await ctx.defer()
 
         if uid is None or server is None:
-            return await self.send_temp(ctx, "⚠️ UID and server are required.")
+            return await self.respond(ctx, "⚠️ UID and server are required.")
 
         if not await self.check_channel(ctx):
+            metrics.LIKE_REJECTIONS.inc(reason="channel")
             msg = "This command is not available in this channel. Please use it in an authorized channel."
-            return await self.send_temp(ctx, msg)
-
-        # Daily Limit Check
-        allowed, limit = await self.check_daily_limit(ctx)
-        if not allowed:
-            embed = discord.Embed(
-                title="🚫 Daily Limit Reached!",
-                description=(
-                    f"❌ You already used your **{limit} like(s)** today.\n\n"
-                    f"✨ Upgrade to **Premium** role and enjoy **Unlimited Likes** 🚀"
-                ),
-                color=discord.Color.gold(),  # Premium golden color
-                timestamp=datetime.now()
-            )
-            embed.set_footer(text="⏳ Limit resets every midnight (UTC)")
-            embed.set_thumbnail(url="https://cdn-icons-png.flaticon.com/512/3135/3135715.png")  # VIP Icon
-            return await self.send_temp(ctx, embed=embed, delay=5) 
-
-        # Cooldown
-        user_id = ctx.author.id
-        cooldown = 30
-        if user_id in self.cooldowns:
-            last_used = self.cooldowns[user_id]
-            remaining = cooldown - (datetime.now() - last_used).seconds
-            if remaining > 0:
-                return await self.send_temp(ctx, f"Please wait {remaining} seconds before using this command again.")
-        self.cooldowns[user_id] = datetime.now()
-
-        # UID Validation
+            return await self.respond(ctx, msg)
+
+        # UID Validation (before any quota is taken)
         if not uid.isdigit() or len(uid) < 6:
-            return await self.send_temp(ctx, "❌ Invalid UID. Must be at least 6 digits and numbers only.")
+            metrics.LIKE_REJECTIONS.inc(reason="invalid_uid")
+            return await self.respond(ctx, "❌ Invalid UID. Must be at least 6 digits and numbers only.")
+
+        if not self.known_region(server):
+            metrics.LIKE_REJECTIONS.inc(reason="invalid_region")
+            return await self.respond(ctx, self.unknown_region_message(server))
+
+        # Cached answers (player not found, max likes today) cost no quota at all
+        cached = self.like_api.cached(uid, server)
+        if cached is not None:
+            await self._send_like_result(ctx, uid, server, *cached)
+            return
+
+        # Cooldown, daily limit and the region's upstream budget, taken together
+        reservation = await self.reserve_quota(ctx, server)
+        if reservation is None:
+            return
 
+        outcome, started = "error", False
         try:
             async with ctx.typing():
-                url = f"{self.api_host}/like?uid={uid}&server={server}"
-                print(url)
-                async with self.session.get(url) as response:
-                    if response.status == 404:
-                        return await self._send_player_not_found(ctx, uid)
-
-                    if response.status != 200:
-                        print(f"API Error: {response.status} - {await response.text()}")
-                        return await self._send_api_error(ctx)
-
-                    data = await response.json()
-
-                    # === SUCCESS CASE ===
-                    if data.get("status") == 1:
-                        embed = discord.Embed(
-                            title="👑 VenoX Corporation 👑",
-                            description="💖 **Likes delivered successfully!**\n✨ Perfect execution!",
-                            color=0x2ECC71,
-                            timestamp=datetime.now(),
-                        )
-
-                        embed.add_field(
-                            name="👤 Player Info",
-                            value=f"```UID  : {uid}\nName : {data.get('player','Unknown')}```",
-                            inline=True,
-                        )
-                        embed.add_field(
-                            name="🌍 Server Region",
-                            value=f"```{server.upper()} Server```",
-                            inline=True,
-                        )
-
-                        before = data.get("likes_before", "N/A")
-                        after = data.get("likes_after", "N/A")
-                        added = data.get("likes_added", 0)
-                        embed.add_field(
-                            name="📊 Like Status",
-                            value=f"```Before: {before} likes\nAfter : {after} likes\nAdded : {added} likes```",
-                            inline=False,
-                        )
-
-                        embed.add_field(
-                            name="⚡ Execution Info",
-                            value=f"👤 Requested by: {ctx.author.mention}\n🕒 Time: <t:{int(datetime.now().timestamp())}:R>",
-                            inline=False,
-                        )
-
-                        embed.set_image(url="https://imgur.com/DP9mL1P.gif")
-                        embed.set_footer(text="🔰Developer: ! 1n Only Leo")
-                        embed.description += "\n🔗 JOIN : https://discord.gg/dHkkwvCkWt"
-
-                        await ctx.send(embed=embed)
-
-                    # === FAILED CASE ===
-                    else:
-                        embed = discord.Embed(
-                            title="❌ LIKE FAILED",
-                            description="⚠️ This UID has already received the maximum likes today.\nPlease wait **24 hours** and try again.",
-                            color=0xE74C3C,
-                            timestamp=datetime.now(),
-                        )
-                        embed.set_footer(text=f"🔰 Requested by {ctx.author}", icon_url=ctx.author.display_avatar.url)
-                        await self.send_temp(ctx, embed=embed)
+                async def notify_position(position):
+                    # Slash: shown in the deferred response until the result replaces it
+                    msg = f"⏳ Many requests right now, you are #{position} in the queue..."
+                    await self.respond(ctx, msg, temp=not is_slash)
+
+                async def call_upstream():
+                    nonlocal started
+                    # The answer may have been cached while this request was queued
+                    cached = self.like_api.cached(uid, server)
+                    if cached is not None:
+                        return cached
+                    started = True
+                    return await asyncio.wait_for(self.like_api.send_like(uid, server), UPSTREAM_BUDGET)
+
+                # Queue wait + upstream call are bounded; the shared upstream request
+                # keeps running for other callers even if this one gives up
+                status, data = await asyncio.wait_for(
+                    self.dispatcher.submit(
+                        ctx.guild.id if ctx.guild else 0, server, call_upstream, on_queued=notify_position
+                    ),
+                    QUEUE_BUDGET + UPSTREAM_BUDGET,
+                )
+                outcome = await self._send_like_result(ctx, uid, server, status, data)
 
+        except QueueFullError:
+            outcome = "busy"
+            metrics.LIKE_REQUESTS.inc(outcome=outcome)
+            await self._send_error_embed(ctx, "Busy", "Too many like requests right now. Please try again in a minute.")
         except asyncio.TimeoutError:
+            outcome = "timeout"
+            metrics.LIKE_REQUESTS.inc(outcome=outcome)
             await self._send_error_embed(ctx, "Timeout", "The server took too long to respond.")
         except Exception as e:
+            metrics.LIKE_REQUESTS.inc(outcome="error")
             print(f"Unexpected error in like_command: {e}")
             await self._send_error_embed(ctx, "Critical Error", "An unexpected error occurred. Please try again later.")
+        finally:
+            # Only delivered likes count against the daily quota; the cooldown and
+            # region budget stay spent once the upstream API was actually called
+            if outcome != "success":
+                self.refund_quota(reservation, outcome, upstream_reached=started)
+
+    @staticmethod
+    def _outcome_of(status, data) -> str:
+        if status == 404:
+            return "not_found"
+        if status != 200:
+            return "api_error"
+        return "success" if data.get("status") == 1 else "max_likes"
+
+    async def _send_like_result(self, ctx, uid, server, status, data):
+        """Reply with the embed for an upstream answer and return its outcome."""
+        outcome = self._outcome_of(status, data)
+        metrics.LIKE_REQUESTS.inc(outcome=outcome)
+        if outcome == "not_found":
+            await self._send_player_not_found(ctx, uid)
+        elif outcome == "api_error":
+            await self._send_api_error(ctx)
+
+        # === SUCCESS CASE ===
+        elif outcome == "success":
+            embed = self.templates(ctx).success(uid, server, data, ctx.author)
+            await self.respond(ctx, embed=embed, temp=False)
+
+        # === FAILED CASE ===
+        else:
+            embed = self.templates(ctx).like_failed(ctx.author)
+            await self.respond(ctx, embed=embed)
+        return outcome
+
+    # =================== BATCH LIKE COMMAND ===================
+    @commands.hybrid_command(name="likebatch", description="Sends likes to many Free Fire players at once (premium)")
+    @app_commands.describe(server="Server region of every UID", uids="Player UIDs separated by spaces or commas")
+    async def like_batch_command(self, ctx: commands.Context, server: str, *, uids: str):
+        if ctx.interaction is not None:
+            # Premium and quota checks may call Discord: acknowledge within the 3s window first
+            await ctx.defer()
+
+        if ctx.guild is None:
+            return await self.respond(ctx, "This command can only be used in a server.")
+
+        if not await self.check_channel(ctx):
+            metrics.LIKE_REJECTIONS.inc(reason="channel")
+            msg = "This command is not available in this channel. Please use it in an authorized channel."
+            return await self.respond(ctx, msg)
+
+        if not self.known_region(server):
+            metrics.LIKE_REJECTIONS.inc(reason="invalid_region")
+            return await self.respond(ctx, self.unknown_region_message(server))
+
+        try:
+            premium = await asyncio.wait_for(self.is_premium(ctx), CHECK_BUDGET)
+        except asyncio.TimeoutError:
+            metrics.LIKE_REQUESTS.inc(outcome="timeout")
+            return await self._send_error_embed(ctx, "Timeout", "Discord took too long to answer. Please try again.")
+        if not premium:
+            metrics.LIKE_REJECTIONS.inc(reason="not_premium")
+            return await self.respond(ctx, "💎 /likebatch is reserved for the **Premium** role.")
+
+        # Validate once: dedupe, keep order, split off malformed UIDs
+        valid, invalid = [], []
+        for uid in dict.fromkeys(u for u in re.split(r"[\s,;]+", uids) if u):
+            (valid if uid.isdigit() and len(uid) >= 6 else invalid).append(uid)
+        if not valid:
+            metrics.LIKE_REJECTIONS.inc(reason="invalid_uid")
+            return await self.respond(ctx, "❌ No valid UID. Each must be at least 6 digits and numbers only.")
+        if len(valid) > BATCH_MAX_UIDS:
+            return await self.respond(ctx, f"❌ Too many UIDs ({len(valid)}). The limit is {BATCH_MAX_UIDS} per batch.")
+
+        # One cooldown for the whole batch; each UID takes upstream budget on its own
+        reservation = await self.reserve_quota(ctx, count_daily=False)
+        if reservation is None:
+            return
+
+        templates = self.templates(ctx)
+        results = {}
+        reached = set()   # UIDs whose like actually went upstream
+        # Slash: the table replaces the deferred response and is edited in place
+        message = await self.respond(
+            ctx, embed=templates.batch_progress(server, valid, results, invalid, ctx.author), temp=False
+        )
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def run(uid):
+            async with semaphore:
+                outcome, data, upstream_reached = await self._like_outcome(ctx.guild.id, uid, server)
+                results[uid] = outcome, data
+                if upstream_reached:
+                    reached.add(uid)
+
+        # One message edited at most every BATCH_EDIT_INTERVAL instead of one post per UID
+        pending = {asyncio.create_task(run(uid)) for uid in valid}
+        shown = 0
+        try:
+            while pending:
+                _, pending = await asyncio.wait(pending, timeout=BATCH_EDIT_INTERVAL)
+                if pending and len(results) != shown:
+                    shown = len(results)
+                    await self._edit_batch(message, templates.batch_progress(server, valid, results, invalid, ctx.author))
+        finally:
+            for task in pending:
+                task.cancel()
+        await self._edit_batch(message, templates.batch_progress(server, valid, results, invalid, ctx.author, finished=True))
+        if not any(outcome == "success" for outcome, _ in results.values()):
+            self.refund_quota(reservation, "batch_failed", upstream_reached=bool(reached))
+
+    async def _like_outcome(self, guild_id, uid, server):
+        """
+        One like through the dispatcher, reduced to (outcome, data) for the
+        batch table, plus whether the upstream API was called for it.
+        """
+        cached = self.like_api.cached(uid, server)
+        if cached is not None:
+            # Known answer: no queue slot, no upstream budget
+            outcome = self._outcome_of(*cached)
+            metrics.LIKE_REQUESTS.inc(outcome=outcome)
+            return outcome, cached[1], False
+
+        if not await self.quota.acquire_upstream(server, QUEUE_BUDGET):
+            metrics.LIKE_REJECTIONS.inc(reason="region_budget")
+            return "busy", None, False
+        started = False
+
+        async def call_upstream():
+            nonlocal started
+            cached = self.like_api.cached(uid, server)
+            if cached is not None:
+                return cached
+            started = True
+            return await asyncio.wait_for(self.like_api.send_like(uid, server), UPSTREAM_BUDGET)
+
+        try:
+            # Same budget as /like: one stuck UID can't hold the whole batch open
+            status, data = await asyncio.wait_for(
+                self.dispatcher.submit(guild_id, server, call_upstream), QUEUE_BUDGET + UPSTREAM_BUDGET
+            )
+            outcome = self._outcome_of(status, data)
+        except QueueFullError:
+            data, outcome = None, "busy"
+        except asyncio.TimeoutError:
+            data, outcome = None, "timeout"
+        except Exception as e:
+            print(f"Unexpected error in likebatch for {uid}: {e}")
+            data, outcome = None, "error"
+        metrics.LIKE_REQUESTS.inc(outcome=outcome)
+        # The region token comes back only if the call never went upstream
+        if not started:
+            self.quota.refund_upstream(server)
+            metrics.LIKE_QUOTA_REFUNDS.inc(outcome=outcome)
+        return outcome, data, started
+
+    async def _edit_batch(self, message, embed):
+        if message is None:
+            return
+        try:
+            await message.edit(embed=embed)
+        except discord.HTTPException as e:
+            print(f"[likebatch edit error] {e}")
 
     # =================== ERROR HANDLING ===================
     async def _send_player_not_found(self, ctx, uid):
-        embed = discord.Embed(
-            title="Player Not Found",
-            description=f"The UID {uid} does not exist or is not accessible.",
-            color=0xE74C3C,
-        )
-        embed.add_field(
-            name="Tip",
-            value="Make sure that:\n- The UID is correct\n- The player is not private",
-            inline=False,
-        )
-        await self.send_temp(ctx, embed=embed)
+        await self.respond(ctx, embed=self.templates(ctx).player_not_found(uid))
 
     async def _send_api_error(self, ctx):
-        embed = discord.Embed(
-            title="⚠️ Service Unavailable",
-            description="The Free Fire API is not responding at the moment.",
-            color=0xF39C12,
-        )
-        embed.add_field(name="Solution", value="Try again in a few minutes.", inline=False)
-        await self.send_temp(ctx, embed=embed)
+        await self.respond(ctx, embed=self.templates(ctx).api_error())
 
     async def _send_error_embed(self, ctx, title, description, ephemeral=False):
-        embed = discord.Embed(
-            title=f"❌ {title}",
-            description=description,
-            color=discord.Color.red(),
-            timestamp=datetime.now(),
-        )
-        embed.set_footer(text="An error occurred.")
-        await self.send_temp(ctx, embed=embed)
+        await self.respond(ctx, embed=self.templates(ctx).error(title, description))
 
-    def cog_unload(self):
-        self.bot.loop.create_task(self.session.close())
+    async def cog_unload(self):
+        self.compact_state_task.cancel()
+        await self.dispatcher.stop()
+        await asyncio.to_thread(self.store.close)
 
 async def setup(bot):
     await bot.add_cog(LikeCommands(bot))
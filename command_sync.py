@@ -0,0 +1,70 @@
+# command_sync.py
+import hashlib
+import json
+import os
+
+import discord
+from dotenv import load_dotenv
+
+load_dotenv()
+HASH_FILE = ".command_tree_hash.json"
+FORCE_COMMAND_SYNC = os.getenv("FORCE_COMMAND_SYNC", "0") == "1"
+# Development: sync to this guild only (instant) instead of globally
+DEV_GUILD_ID = os.getenv("DEV_GUILD_ID")
+
+
+def _command_payload(command, tree):
+    try:
+        return command.to_dict(tree)  # discord.py >= 2.4
+    except TypeError:
+        return command.to_dict()
+
+
+def tree_hash(tree, guild=None) -> str:
+    """Stable hash of the app commands that a sync would upload."""
+    payloads = [_command_payload(cmd, tree) for cmd in tree.get_commands(guild=guild)]
+    payloads.sort(key=lambda p: (p.get("type", 1), p["name"]))
+    encoded = json.dumps(payloads, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _load_hashes():
+    if os.path.exists(HASH_FILE):
+        try:
+            with open(HASH_FILE, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            pass
+    return {}
+
+
+def _save_hashes(hashes):
+    temp_file = HASH_FILE + ".tmp"
+    with open(temp_file, "w") as f:
+        json.dump(hashes, f, indent=4)
+    os.replace(temp_file, HASH_FILE)
+
+
+async def sync_command_tree(tree, force: bool = FORCE_COMMAND_SYNC, dev_guild_id=DEV_GUILD_ID) -> bool:
+    """
+    Sync the command tree only when it changed since the last successful
+    sync (or when forced). Returns True if a sync call was made.
+    """
+    guild = None
+    key = "global"
+    if dev_guild_id:
+        guild = discord.Object(id=int(dev_guild_id))
+        tree.copy_global_to(guild=guild)
+        key = f"guild:{dev_guild_id}"
+
+    current = tree_hash(tree, guild=guild)
+    hashes = _load_hashes()
+    if not force and hashes.get(key) == current:
+        print(f"✔ Command tree unchanged ({key}), skipping sync")
+        return False
+
+    synced = await tree.sync(guild=guild)
+    hashes[key] = current
+    _save_hashes(hashes)
+    print(f"✔ Synced {len(synced)} commands ({key})")
+    return True
@@ -0,0 +1,105 @@
+# diagnostics.py
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+DIAGNOSTICS = os.getenv("DIAGNOSTICS", "0") == "1"
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "100"))
+PROFILE_DIR = "profiles"
+MAX_PROFILE_SECONDS = 120
+
+
+class LoopWatchdog:
+    """
+    Detects event-loop stalls from outside the loop.
+
+    A task on the loop bumps a heartbeat; a watchdog thread checks it and,
+    when the loop has been stuck longer than `threshold_ms`, prints the loop
+    thread's current stack (i.e. the blocking callback), once per stall.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_CALLBACK_MS):
+        self.threshold = threshold_ms / 1000
+        self.loop_thread_id = None
+        self._beat = time.monotonic()
+        self._task = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        """Call from the event loop thread."""
+        self.loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"🩺 Diagnostics on: reporting loop stalls over {self.threshold * 1000:.0f} ms")
+
+    def stop(self):
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        interval = self.threshold / 4
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(interval)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stopping.wait(self.threshold / 4):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled <= self.threshold + self.threshold / 4 or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>\n"
+            print(f"🐢 Event loop blocked for {stalled * 1000:.0f} ms, currently in:\n{stack}", end="")
+
+
+def sample_profile(thread_id: int, seconds: float, interval: float = 0.005) -> Counter:
+    """
+    Sample the stack of `thread_id` every `interval` seconds for `seconds`
+    and count identical stacks. Blocking; run it in a thread.
+    """
+    samples = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            samples[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+    return samples
+
+
+def write_profile(samples: Counter, directory: str = PROFILE_DIR) -> str:
+    """Write samples in collapsed-stack format (one `stack count` per line)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+    return path
+
+
+def top_frames(samples: Counter, limit: int = 10):
+    """Leaf frames that appear in the most samples."""
+    leaves = Counter()
+    for stack, count in samples.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    return leaves.most_common(limit)
@@ -0,0 +1,180 @@
+# dispatcher.py
+import asyncio
+import os
+from collections import deque, defaultdict
+
+WORKER_COUNT = int(os.getenv("LIKE_WORKERS", "8"))
+REGION_CONCURRENCY = int(os.getenv("LIKE_REGION_CONCURRENCY", "4"))
+QUEUE_SIZE = int(os.getenv("LIKE_QUEUE_SIZE", "200"))
+# Per-region overrides, e.g. "br:6,ind:4"
+REGION_LIMITS = os.getenv("LIKE_REGION_LIMITS", "")
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when the dispatch queue is at capacity."""
+
+
+def _parse_region_limits(raw: str) -> dict:
+    limits = {}
+    for part in raw.split(","):
+        if ":" in part:
+            region, limit = part.split(":", 1)
+            try:
+                limits[region.strip().lower()] = int(limit)
+            except ValueError:
+                print(f"⚠️ Ignoring invalid region limit '{part}'")
+    return limits
+
+
+class _Job:
+    __slots__ = ("guild_id", "region", "factory", "future")
+
+    def __init__(self, guild_id, region, factory, future):
+        self.guild_id = guild_id
+        self.region = region
+        self.factory = factory
+        self.future = future
+
+
+class LikeDispatcher:
+    """
+    Runs upstream /like calls on a fixed pool of workers.
+
+    Jobs are queued per guild and served round-robin across guilds, so one
+    busy server can't starve the others. Each region has its own cap on
+    concurrent calls, and the total queue is bounded: submit() raises
+    QueueFullError instead of letting a burst pile up. When `regions` is
+    given, submit() rejects any other region with ValueError.
+    """
+
+    def __init__(self, worker_count: int = WORKER_COUNT, region_concurrency: int = REGION_CONCURRENCY,
+                 queue_size: int = QUEUE_SIZE, region_limits: dict | None = None, regions=None):
+        self.worker_count = worker_count
+        self.region_concurrency = region_concurrency
+        self.queue_size = queue_size
+        self.region_limits = region_limits if region_limits is not None else _parse_region_limits(REGION_LIMITS)
+        self.regions = frozenset(r.lower() for r in regions) if regions is not None else None
+
+        self._queues = {}            # guild_id -> deque[_Job]
+        self._rotation = deque()     # guild ids with pending jobs, in serving order
+        self._active = defaultdict(int)
+        self._queued = 0
+        self._idle = 0
+        self._cond = None
+        self._workers = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def start(self):
+        if self._workers:
+            return
+        self._cond = asyncio.Condition()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+        self._rotation.clear()
+        self._queued = 0
+
+    async def submit(self, guild_id, region: str, factory, on_queued=None):
+        """
+        Queue `factory()` (a coroutine function) and return its result.
+
+        If the job can't start right away, `on_queued(position)` is awaited
+        with its approximate place in line.
+        """
+        region = region.lower()
+        if self.regions is not None and region not in self.regions:
+            raise ValueError(f"Unknown region '{region}'")
+        if self._queued >= self.queue_size:
+            raise QueueFullError()
+
+        job = _Job(guild_id, region, factory, asyncio.get_running_loop().create_future())
+        async with self._cond:
+            queue = self._queues.get(guild_id)
+            if queue is None:
+                queue = self._queues[guild_id] = deque()
+                self._rotation.append(guild_id)
+            queue.append(job)
+            self._queued += 1
+            position = self._queued
+            must_wait = self._idle < position
+            self._cond.notify()
+
+        if must_wait and on_queued is not None:
+            try:
+                await on_queued(position)
+            except Exception as e:
+                print(f"[dispatcher] on_queued error: {e}")
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+
+    def _limit_for(self, region):
+        return self.region_limits.get(region, self.region_concurrency)
+
+    def _next_job(self):
+        """Pop the next runnable job, rotating across guilds. Caller holds _cond."""
+        for _ in range(len(self._rotation)):
+            if not self._rotation:
+                break
+            guild_id = self._rotation[0]
+            queue = self._queues[guild_id]
+
+            # Skip jobs whose caller already gave up
+            while queue and queue[0].future.done():
+                queue.popleft()
+                self._queued -= 1
+            if not queue:
+                self._rotation.popleft()
+                del self._queues[guild_id]
+                continue
+
+            self._rotation.rotate(-1)
+            if self._active[queue[0].region] < self._limit_for(queue[0].region):
+                self._queued -= 1
+                return queue.popleft()
+        return None
+
+    async def _worker(self):
+        while True:
+            async with self._cond:
+                self._idle += 1
+                try:
+                    job = self._next_job()
+                    while job is None:
+                        await self._cond.wait()
+                        job = self._next_job()
+                finally:
+                    self._idle -= 1
+                self._active[job.region] += 1
+
+            try:
+                if job.future.done():
+                    continue
+                result = await job.factory()
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                async with self._cond:
+                    self._active[job.region] -= 1
+                    # a region slot freed up: every waiter may now have work
+                    self._cond.notify_all()
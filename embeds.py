@@ -0,0 +1,198 @@
+# embeds.py
+from datetime import datetime
+
+import discord
+
+# Branding a guild can override through the "branding" key of its config
+DEFAULT_BRANDING = {
+    "title": "👑 VenoX Corporation 👑",
+    "color": 0x2ECC71,
+    "image": "https://imgur.com/DP9mL1P.gif",
+    "footer": "🔰Developer: ! 1n Only Leo",
+    "join_url": "https://discord.gg/dHkkwvCkWt",
+    "premium_thumbnail": "https://cdn-icons-png.flaticon.com/512/3135/3135715.png",
+}
+
+# /likebatch table cells (plain text: emoji widths break code-block alignment)
+BATCH_LABELS = {
+    "pending": "...",
+    "success": "OK",
+    "max_likes": "MAX TODAY",
+    "not_found": "NOT FOUND",
+    "api_error": "API ERROR",
+    "timeout": "TIMEOUT",
+    "busy": "BUSY",
+    "error": "ERROR",
+}
+
+def _parse_color(value, default: int = DEFAULT_BRANDING["color"]) -> int:
+    """A branding color as an int: accepts 3066993, "3066993", "#2ECC71" or "0x2ECC71"."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        color = value
+    else:
+        text = str(value).strip().lower()
+        try:
+            if text.startswith("#"):
+                color = int(text[1:], 16)
+            elif text.startswith("0x"):
+                color = int(text, 16)
+            else:
+                color = int(text)
+        except ValueError:
+            print(f"⚠️ Invalid branding color '{value}', using the default")
+            return default
+    if not 0 <= color <= 0xFFFFFF:
+        print(f"⚠️ Branding color '{value}' out of range, using the default")
+        return default
+    return color
+
+
+NOT_FOUND_TIP = {
+    "name": "Tip",
+    "value": "Make sure that:\n- The UID is correct\n- The player is not private",
+    "inline": False,
+}
+
+
+class EmbedTemplates:
+    """
+    Prebuilt embed skeletons for every /like outcome.
+
+    Each skeleton is a plain dict built once; rendering copies the top level,
+    adds the dynamic parts and hands it to discord.Embed.from_dict. Nested
+    skeleton dicts are shared between renders and must never be mutated.
+    """
+
+    def __init__(self, branding: dict | None = None):
+        b = {**DEFAULT_BRANDING, **(branding if isinstance(branding, dict) else {})}
+        description = "💖 **Likes delivered successfully!**\n✨ Perfect execution!"
+        if b["join_url"]:
+            description += f"\n🔗 JOIN : {b['join_url']}"
+
+        self._success = {
+            "title": b["title"],
+            "description": description,
+            "color": _parse_color(b["color"]),
+            "footer": {"text": b["footer"]},
+        }
+        if b["image"]:
+            self._success["image"] = {"url": b["image"]}
+
+        self._like_failed = {
+            "title": "❌ LIKE FAILED",
+            "description": "⚠️ This UID has already received the maximum likes today.\nPlease wait **24 hours** and try again.",
+            "color": 0xE74C3C,
+        }
+        self._not_found = {
+            "title": "Player Not Found",
+            "color": 0xE74C3C,
+        }
+        self._api_error = {
+            "title": "⚠️ Service Unavailable",
+            "description": "The Free Fire API is not responding at the moment.",
+            "color": 0xF39C12,
+            "fields": [{"name": "Solution", "value": "Try again in a few minutes.", "inline": False}],
+        }
+        self._daily_limit = {
+            "title": "🚫 Daily Limit Reached!",
+            "color": 0xF1C40F,  # Premium golden color
+            "footer": {"text": "⏳ Limit resets every midnight (UTC)"},
+            "thumbnail": {"url": b["premium_thumbnail"]},  # VIP Icon
+        }
+        self._error = {
+            "color": 0xE74C3C,
+            "footer": {"text": "An error occurred."},
+        }
+
+    @staticmethod
+    def _render(skeleton, timestamp=False, **dynamic):
+        embed = discord.Embed.from_dict({**skeleton, **dynamic})
+        if timestamp:
+            embed.timestamp = datetime.now()
+        return embed
+
+    # =================== OUTCOMES ===================
+    def success(self, uid, server, data, requester) -> discord.Embed:
+        before = data.get("likes_before", "N/A")
+        after = data.get("likes_after", "N/A")
+        added = data.get("likes_added", 0)
+        fields = [
+            {"name": "👤 Player Info", "value": f"```UID  : {uid}\nName : {data.get('player', 'Unknown')}```", "inline": True},
+            {"name": "🌍 Server Region", "value": f"```{server.upper()} Server```", "inline": True},
+            {"name": "📊 Like Status", "value": f"```Before: {before} likes\nAfter : {after} likes\nAdded : {added} likes```", "inline": False},
+            {"name": "⚡ Execution Info", "value": f"👤 Requested by: {requester.mention}\n🕒 Time: <t:{int(datetime.now().timestamp())}:R>", "inline": False},
+        ]
+        return self._render(self._success, timestamp=True, fields=fields)
+
+    def like_failed(self, requester) -> discord.Embed:
+        footer = {"text": f"🔰 Requested by {requester}", "icon_url": requester.display_avatar.url}
+        return self._render(self._like_failed, timestamp=True, footer=footer)
+
+    def player_not_found(self, uid) -> discord.Embed:
+        return self._render(
+            self._not_found,
+            description=f"The UID {uid} does not exist or is not accessible.",
+            fields=[NOT_FOUND_TIP],
+        )
+
+    def api_error(self) -> discord.Embed:
+        return self._render(self._api_error)
+
+    def daily_limit(self, limit) -> discord.Embed:
+        description = (
+            f"❌ You already used your **{limit} like(s)** today.\n\n"
+            f"✨ Upgrade to **Premium** role and enjoy **Unlimited Likes** 🚀"
+        )
+        return self._render(self._daily_limit, timestamp=True, description=description)
+
+    def error(self, title, description) -> discord.Embed:
+        return self._render(self._error, timestamp=True, title=f"❌ {title}", description=description)
+
+    def batch_progress(self, server, uids, results, invalid, requester, finished=False) -> discord.Embed:
+        """
+        One compact table for a /likebatch run. `results` maps uid ->
+        (outcome, data) for the UIDs done so far; the rest show as pending.
+        """
+        lines, counts = [], {}
+        for uid in uids:
+            outcome, data = results.get(uid, ("pending", None))
+            counts[outcome] = counts.get(outcome, 0) + 1
+            cell = BATCH_LABELS.get(outcome, outcome.upper())
+            if outcome == "success":
+                cell += f" +{data.get('likes_added', 0)}"
+            lines.append(f"{uid:<12} {cell}")
+
+        done = len(uids) - counts.pop("pending", 0)
+        fields = [{
+            "name": "📊 Progress",
+            "value": f"{done}/{len(uids)} done"
+            + "".join(f" • {BATCH_LABELS.get(k, k).lower()}: {v}" for k, v in counts.items()),
+            "inline": False,
+        }]
+        if invalid:
+            shown = ", ".join(invalid[:10]) + (f" (+{len(invalid) - 10})" if len(invalid) > 10 else "")
+            fields.append({"name": "⚠️ Skipped invalid UIDs", "value": shown[:1024], "inline": False})
+
+        embed = {
+            "title": f"{'✅' if finished else '⏳'} Batch Like • {server.upper()} Server",
+            "description": "```\n" + "\n".join(lines) + "\n```",
+            "color": self._success["color"] if finished else 0xF1C40F,
+            "fields": fields,
+            "footer": {"text": f"🔰 Requested by {requester}", "icon_url": requester.display_avatar.url},
+        }
+        return self._render(embed, timestamp=True)
+
+
+_default_templates = EmbedTemplates()
+
+
+def templates_for(settings) -> EmbedTemplates:
+    """
+    Templates for a guild's parsed GuildSettings, built on first use and
+    kept on them: a config change brings new settings, hence new templates.
+    """
+    templates = settings.templates
+    if templates is None:
+        branding = settings.raw.get("branding")
+        templates = settings.templates = EmbedTemplates(branding) if branding else _default_templates
+    return templates
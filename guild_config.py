@@ -0,0 +1,183 @@
+# guild_config.py
+import json
+import os
+import threading
+import time
+
+import persistence
+
+CONFIG_FILE = "like_channels.json"
+SAVE_DELAY = 2.0       # batch admin changes made within this window into one write
+RELOAD_CHECK = 5.0     # seconds between mtime checks for external edits
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class GuildSettings:
+    """
+    Parsed view of one guild's config for the hot paths: channel ids as a
+    frozenset of ints, the premium role as an int and the quota overrides
+    (daily_limit, cooldown, role_limits {role id: daily limit, 0 = unlimited}).
+    `raw` is the stored JSON dict (read-only; copy it to make changes).
+    `templates` holds the guild's EmbedTemplates once embeds.templates_for()
+    built them, so they live exactly as long as this config version.
+    """
+
+    __slots__ = ("like_channels", "premium_role", "daily_limit", "cooldown", "role_limits", "raw", "templates")
+
+    def __init__(self, raw: dict):
+        self.raw = raw
+        self.templates = None
+        channels = (_parse_id(c) for c in raw.get("like_channels", ()))
+        self.like_channels = frozenset(c for c in channels if c is not None)
+        self.premium_role = _parse_id(raw.get("premium_role"))
+        self.daily_limit = _parse_id(raw.get("daily_limit"))
+        self.cooldown = _parse_id(raw.get("cooldown"))
+        role_limits = {}
+        for role_id, limit in (raw.get("role_limits") or {}).items():
+            role_id, limit = _parse_id(role_id), _parse_id(limit)
+            if role_id is not None and limit is not None:
+                role_limits[role_id] = limit
+        self.role_limits = role_limits
+
+    def allows_channel(self, channel_id: int) -> bool:
+        # No configured channel means /like is allowed everywhere
+        return not self.like_channels or channel_id in self.like_channels
+
+
+EMPTY_SETTINGS = GuildSettings({})
+
+
+class GuildConfigCache:
+    """
+    In-memory index of like_channels.json ({"servers": {guild_id: config}}).
+
+    Reads are dict lookups on a prebuilt GuildSettings index. The file's
+    mtime is checked at most every `reload_check` seconds and the whole
+    index is rebuilt and swapped in when someone else edited it. Changes
+    are applied in memory and written by a timer `save_delay` seconds after
+    the last one (tmp file + os.replace).
+    """
+
+    def __init__(self, path: str = CONFIG_FILE, save_delay: float = SAVE_DELAY,
+                 reload_check: float = RELOAD_CHECK):
+        self.path = path
+        self.save_delay = save_delay
+        self.reload_check = reload_check
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._stamp = None
+        self._next_check = 0.0
+        self._servers, self._index = {}, {}
+        self._extra = {}       # other top-level keys of the file, written back untouched
+        # A missing file is created; an invalid one is left alone for the admin to fix
+        if not self._reload() and self._stamp is None:
+            self._dirty = True
+            self.flush()
+        persistence.register(self)
+
+    # =================== LOADING ===================
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self) -> bool:
+        """(Re)build the index from disk. Returns False if the file is missing or corrupt."""
+        stamp = self._file_stamp()
+        if stamp is None:
+            return False
+        try:
+            with open(self.path, "r") as f:
+                document = json.load(f)
+            if not isinstance(document, dict):
+                raise ValueError("top level must be an object")
+            servers = document.pop("servers", {})
+            if not isinstance(servers, dict) or not all(isinstance(c, dict) for c in servers.values()):
+                raise ValueError("'servers' must map guild ids to objects")
+            # Build before swapping: a bad edit must never replace a working index
+            index = {guild_id: GuildSettings(config) for guild_id, config in servers.items()}
+        except (ValueError, TypeError, AttributeError) as e:  # JSONDecodeError is a ValueError
+            print(f"WARNING: The configuration file '{self.path}' is invalid ({e}). Keeping the current configuration.")
+            self._stamp = stamp
+            return False
+        self._extra = document
+        # Single assignments: readers see either the old or the new index
+        self._servers, self._index = servers, index
+        self._stamp = stamp
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_check
+        with self._lock:
+            if self._dirty or self._file_stamp() == self._stamp:
+                return
+            if self._reload():
+                print(f"🔄 {self.path} changed on disk, guild config reloaded")
+
+    # =================== ACCESS ===================
+    def get(self, guild_id: str) -> GuildSettings:
+        self._maybe_reload()
+        return self._index.get(guild_id, EMPTY_SETTINGS)
+
+    def get_raw(self, guild_id: str) -> dict:
+        return self.get(guild_id).raw
+
+    def longest_cooldown(self):
+        """Longest "cooldown" override across all guilds, or None."""
+        self._maybe_reload()
+        cooldowns = [s.cooldown for s in self._index.values() if s.cooldown is not None]
+        return max(cooldowns, default=None)
+
+    def set(self, guild_id: str, config: dict):
+        with self._lock:
+            servers = dict(self._servers)
+            servers[guild_id] = config
+            index = dict(self._index)
+            index[guild_id] = GuildSettings(config)
+            self._servers, self._index = servers, index
+            self._dirty = True
+            # Debounce: every change pushes the write back by save_delay
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # =================== SAVING ===================
+    def _timed_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[guild_config] Save error for {self.path}: {e}")
+
+    def flush(self):
+        """Write pending changes now. Safe to call from any thread."""
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_file = self.path + ".tmp"
+            with open(temp_file, "w") as f:
+                json.dump({**self._extra, "servers": self._servers}, f, indent=4)
+            os.replace(temp_file, self.path)
+            self._dirty = False
+            # Our own write must not look like an external edit
+            self._stamp = self._file_stamp()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
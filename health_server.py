@@ -0,0 +1,126 @@
+# health_server.py
+import os
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+import metrics
+import token_manager
+
+PORT = int(os.environ.get("PORT", 10000))
+
+
+def _iso(dt):
+    return dt.isoformat() if dt else None
+
+
+def _latency_ms(latency: float):
+    # latency is inf/nan until the first heartbeat ack
+    if latency != latency or latency == float("inf"):
+        return None
+    return round(latency * 1000, 1)
+
+
+class HealthServer:
+    """
+    Keepalive, health and metrics endpoints served by aiohttp on the bot's
+    own event loop (no extra thread).
+
+    /         plain "Bot X is active" for uptime pingers
+    /healthz  gateway, latency, cogs and per-zone token freshness: 503
+              "unhealthy" if disconnected or a cog is missing, 200 "degraded"
+              if a zone's tokens are stale or not known yet
+    /readyz   503 until setup_hook has finished
+    /metrics  Prometheus text format
+    """
+
+    def __init__(self, bot, expected_cogs=(), port: int = PORT):
+        self.bot = bot
+        self.expected_cogs = tuple(expected_cogs)
+        self.port = port
+        self._runner = None
+
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get("/", self.home),
+            web.get("/healthz", self.healthz),
+            web.get("/readyz", self.readyz),
+            web.get("/metrics", self.metrics),
+        ])
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "0.0.0.0", self.port).start()
+        print(f"✅ Health server listening on port {self.port}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # =================== ROUTES ===================
+    async def home(self, request):
+        return web.Response(text=f"Bot {self.bot.user} is active")
+
+    def health_report(self) -> dict:
+        now = datetime.now(timezone.utc)
+        zones = {}
+        for zone, state in token_manager.zone_states.items():
+            zones[zone] = {
+                "state": state["state"],
+                "freshness": token_manager.zone_freshness(zone, now),
+                "failures": state["failures"],
+                "last_commit": _iso(token_manager.last_commit_times.get(zone)),
+                "last_success": _iso(state["last_success"]),
+                "last_error": _iso(state["last_error"]),
+            }
+
+        connected = self.bot.is_ready() and not self.bot.is_closed()
+        cogs = {name: name in self.bot.cogs for name in self.expected_cogs}
+        # Token trouble is reported but doesn't fail liveness: restarting the
+        # bot wouldn't fix a zone still starting up or one whose refresh keeps failing
+        stale_zones = [zone for zone, report in zones.items() if report["freshness"] != "fresh"]
+        if not connected or not all(cogs.values()):
+            status = "unhealthy"
+        else:
+            status = "degraded" if stale_zones else "ok"
+        return {
+            "status": status,
+            "gateway_connected": connected,
+            "latency_ms": _latency_ms(self.bot.latency),
+            "guilds": len(self.bot.guilds),
+            "shards": self.shard_report(),
+            "cogs": cogs,
+            "zones": zones,
+            "stale_zones": stale_zones,
+        }
+
+    def shard_report(self):
+        """Per-shard latency and guild count, or None when not sharded."""
+        shards = getattr(self.bot, "shards", None)
+        if not shards:
+            return None
+        guild_counts = {}
+        for guild in self.bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+        return {
+            str(shard_id): {
+                "latency_ms": _latency_ms(shard.latency),
+                "closed": shard.is_closed(),
+                "guilds": guild_counts.get(shard_id, 0),
+            }
+            for shard_id, shard in shards.items()
+        }
+
+    async def healthz(self, request):
+        report = self.health_report()
+        return web.json_response(report, status=503 if report["status"] == "unhealthy" else 200)
+
+    async def readyz(self, request):
+        if getattr(self.bot, "initialized", False):
+            return web.json_response({"ready": True})
+        return web.json_response({"ready": False}, status=503)
+
+    async def metrics(self, request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
@@ -0,0 +1,42 @@
+# http_client.py
+import asyncio
+import os
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "30"))
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+# --- Timeout profiles, one per upstream ---
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=10)
+LIKE_API_TIMEOUT = aiohttp.ClientTimeout(total=float(os.getenv("LIKE_API_TIMEOUT", "20")), connect=5)
+AUTH_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+GITHUB_TIMEOUT = aiohttp.ClientTimeout(total=20, connect=5)
+WEBHOOK_TIMEOUT = aiohttp.ClientTimeout(total=5, connect=3)
+
+
+def create_session() -> aiohttp.ClientSession:
+    """
+    Build the bot-wide ClientSession. Must be called from a running loop
+    (e.g. setup_hook); cogs and the token manager reuse bot.session.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=POOL_LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=DEFAULT_TIMEOUT)
+
+
+async def close_session(session: aiohttp.ClientSession | None):
+    if session is None or session.closed:
+        return
+    await session.close()
+    # Give SSL transports a moment to shut down cleanly
+    await asyncio.sleep(0.25)
@@ -0,0 +1,119 @@
+# like_api.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from http_client import LIKE_API_TIMEOUT
+import metrics
+
+NOT_FOUND_TTL = int(os.getenv("LIKE_NOT_FOUND_TTL", "600"))
+CACHE_MAX_ENTRIES = 10000
+
+
+def _next_utc_midnight() -> float:
+    now = datetime.now(timezone.utc)
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+
+class LikeAPIClient:
+    """
+    Thin client for `GET {API_URL}/like` with single-flight coalescing and a
+    result cache.
+
+    Concurrent calls for the same (uid, server) share one upstream request.
+    Stable answers are cached: "max likes reached" until UTC midnight and
+    "player not found" (404) for NOT_FOUND_TTL seconds.
+    """
+
+    def __init__(self, session, api_host: str, not_found_ttl: int = NOT_FOUND_TTL):
+        self.session = session
+        self.api_host = api_host
+        self.not_found_ttl = not_found_ttl
+        self._cache = {}      # (uid, server) -> (expires_at, status, data)
+        self._inflight = {}   # (uid, server) -> asyncio.Task
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def cached(self, uid: str, server: str):
+        """The cached (http_status, json_data) for a like, or None if it would go upstream."""
+        cached = self._cache.get((uid, server.lower()))
+        if cached is None or cached[0] <= time.time():
+            return None
+        self.hits += 1
+        metrics.LIKE_CACHE.inc(result="hit")
+        return cached[1], cached[2]
+
+    async def send_like(self, uid: str, server: str):
+        """Return (http_status, json_data_or_None) for a like request."""
+        key = (uid, server.lower())
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, status, data = cached
+            if expires_at > time.time():
+                self.hits += 1
+                metrics.LIKE_CACHE.inc(result="hit")
+                return status, data
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            metrics.LIKE_CACHE.inc(result="coalesced")
+        else:
+            self.misses += 1
+            metrics.LIKE_CACHE.inc(result="miss")
+            task = asyncio.ensure_future(self._fetch(key, uid, server))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield: one caller giving up must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, uid, server):
+        url = f"{self.api_host}/like?uid={uid}&server={server}"
+        print(url)
+        with metrics.LIKE_UPSTREAM_LATENCY.time():
+            return await self._request(key, url)
+
+    async def _request(self, key, url):
+        async with self.session.get(url, timeout=LIKE_API_TIMEOUT) as response:
+            if response.status == 404:
+                self._store(key, time.time() + self.not_found_ttl, 404, None)
+                return 404, None
+
+            if response.status != 200:
+                print(f"API Error: {response.status} - {await response.text()}")
+                return response.status, None
+
+            data = await response.json()
+            if data.get("status") != 1:
+                # Upstream won't accept more likes for this UID until the daily reset
+                self._store(key, _next_utc_midnight(), 200, data)
+            return 200, data
+
+    def _store(self, key, expires_at, status, data):
+        if len(self._cache) >= CACHE_MAX_ENTRIES:
+            self.prune()
+            if len(self._cache) >= CACHE_MAX_ENTRIES:
+                # still full of live entries: drop the oldest insert
+                del self._cache[next(iter(self._cache))]
+        self._cache[key] = (expires_at, status, data)
+
+    def prune(self):
+        """Drop expired cache entries."""
+        now = time.time()
+        for key in [k for k, (expires_at, _, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[key]
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "cached": len(self._cache),
+            "inflight": len(self._inflight),
+        }
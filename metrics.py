@@ -0,0 +1,195 @@
+# metrics.py
+import asyncio
+import threading
+import time
+
+# Updates and /metrics scrapes all run on the bot's event loop; the lock keeps
+# the registry safe if an update ever comes from a worker thread (to_thread)
+_lock = threading.Lock()
+_registry = []
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, doc, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, doc, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self._values = {}
+        self._function = None
+
+    def set(self, value: float, **labels):
+        with _lock:
+            self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """Read the (unlabelled) value from `function()` at scrape time."""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            try:
+                return [f"{self.name} {self._function()}"]
+            except Exception:
+                return []
+        with _lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with _lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def _samples(self):
+        with _lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+def render() -> str:
+    """Prometheus text exposition of every registered metric."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# =================== BOT METRICS ===================
+LIKE_REQUESTS = Counter(
+    "like_requests_total", "/like requests by outcome", ["outcome"]
+)
+LIKE_REJECTIONS = Counter(
+    "like_rejections_total", "/like requests rejected before the upstream call", ["reason"]
+)
+LIKE_QUOTA_REFUNDS = Counter(
+    "like_quota_refunds_total", "Quota reservations given back after an undelivered like", ["outcome"]
+)
+LIKE_UPSTREAM_LATENCY = Histogram(
+    "like_upstream_latency_seconds", "Latency of upstream like API calls"
+)
+LIKE_CACHE = Counter(
+    "like_cache_total", "Like API cache lookups", ["result"]
+)
+LIKE_QUEUE_DEPTH = Gauge(
+    "like_queue_depth", "Like requests waiting in the dispatch queue"
+)
+TOKEN_REFRESH_DURATION = Histogram(
+    "token_refresh_duration_seconds", "Duration of a zone token refresh", ["zone"],
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200),
+)
+TOKEN_REFRESH = Counter(
+    "token_refresh_total", "Zone token refreshes by result", ["zone", "result"]
+)
+GITHUB_CALLS = Counter(
+    "github_api_calls_total", "GitHub API calls", ["endpoint", "status"]
+)
+GITHUB_RATE_REMAINING = Gauge(
+    "github_rate_limit_remaining", "X-RateLimit-Remaining from the last GitHub response"
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke a periodic sleeper",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+
+def record_github(response, endpoint: str):
+    GITHUB_CALLS.inc(endpoint=endpoint, status=response.status)
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining is not None:
+        GITHUB_RATE_REMAINING.set(int(remaining))
+
+
+async def monitor_loop_lag(interval: float = 1.0):
+    """Sleep `interval` seconds forever, recording how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0.0))
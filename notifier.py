@@ -0,0 +1,114 @@
+# notifier.py
+import asyncio
+import os
+from collections import deque
+
+from dotenv import load_dotenv
+from http_client import WEBHOOK_TIMEOUT
+
+load_dotenv()
+WEEBOOK_URL = os.getenv("WEEBOOK_URL")
+
+MAX_PENDING = 200        # queued lines before we start dropping
+COALESCE_SECONDS = 1.0   # wait this long after the first line to gather a burst
+DISCORD_LIMIT = 2000
+
+
+class WebhookNotifier:
+    """
+    Queue-backed Discord webhook sender.
+
+    notify() only appends to a queue and never blocks. A background task
+    waits a moment after the first message, then packs everything pending
+    into as few posts as fit in Discord's 2000-char limit, honouring the
+    webhook rate-limit headers. When the queue is full new lines are
+    dropped and a count is posted with the next batch.
+    """
+
+    def __init__(self, url: str | None, max_pending: int = MAX_PENDING):
+        self.url = url
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._dropped = 0
+        self._wakeup = asyncio.Event()
+        self._session = None
+        self._task = None
+
+    def notify(self, message: str):
+        if not self.url:
+            print("[Discord] Notification skipped.")
+            return
+        if len(self._pending) >= self.max_pending:
+            self._dropped += 1
+            return
+        self._pending.append(message)
+        self._wakeup.set()
+
+    def start(self, session):
+        self._session = session
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stop the sender after a last attempt to deliver what's queued."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._session is not None and not self._session.closed:
+            try:
+                await self._send_pending()
+            except Exception as e:
+                print(f"[Discord] Error: {e}")
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(COALESCE_SECONDS)
+            self._wakeup.clear()
+            try:
+                await self._send_pending()
+            except Exception as e:
+                print(f"[Discord] Error: {e}")
+
+    def _take_batches(self):
+        lines = list(self._pending)
+        self._pending.clear()
+        if self._dropped:
+            lines.append(f"… {self._dropped} notification(s) dropped (queue full)")
+            self._dropped = 0
+
+        batches, current = [], ""
+        for line in lines:
+            line = line[:DISCORD_LIMIT]
+            if current and len(current) + 1 + len(line) > DISCORD_LIMIT:
+                batches.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _send_pending(self):
+        for content in self._take_batches():
+            await self._post(content)
+
+    async def _post(self, content: str):
+        for _ in range(3):
+            async with self._session.post(self.url, json={"content": content}, timeout=WEBHOOK_TIMEOUT) as r:
+                if r.status == 429:
+                    retry_after = float((await r.json()).get("retry_after", 1))
+                    await asyncio.sleep(retry_after)
+                    continue
+                if r.status >= 400:
+                    print(f"[Discord] Webhook error {r.status}")
+                # Bucket exhausted: wait for the reset before the next post
+                if r.headers.get("X-RateLimit-Remaining") == "0":
+                    await asyncio.sleep(float(r.headers.get("X-RateLimit-Reset-After", 1)))
+                return
+
+
+notifier = WebhookNotifier(WEEBOOK_URL)
@@ -0,0 +1,173 @@
+# persistence.py
+import json
+import os
+import threading
+import weakref
+
+# Every open store, so the bot can flush them all on shutdown.
+_open_stores = weakref.WeakSet()
+
+
+class WriteBehindJSONStore:
+    """
+    Key/value store backed by a single JSON object on disk.
+
+    Writes go to memory and mark the key dirty. A worker thread flushes
+    every `flush_interval` seconds, or sooner once `flush_threshold` keys
+    are dirty. Only dirty entries are re-encoded on flush; the file is
+    written to a temp file and swapped in with os.replace.
+
+    Values must be treated as immutable: replace them with set(), never
+    mutate them in place. `encode`/`decode` convert between the in-memory
+    value and its JSON form, so callers can keep a compact representation.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 5.0, flush_threshold: int = 500,
+                 encode=None, decode=None):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda raw: raw)
+
+        self._data = self._load()
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+        # Encoded "key": value fragments, owned by whoever holds _write_lock
+        self._fragments = {
+            key: json.dumps(raw, separators=(",", ":")) for key, raw in self._data.items()
+        }
+        self._data = {key: self.decode(raw) for key, raw in self._data.items()}
+
+        _open_stores.add(self)
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        return data
+            except json.JSONDecodeError:
+                print(f"WARNING: '{self.path}' is corrupt or empty. Starting with an empty store.")
+        return {}
+
+    # =================== DICT-LIKE ACCESS ===================
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def items(self):
+        return list(self._data.items())
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._dirty.add(key)
+            dirty_count = len(self._dirty)
+        if dirty_count >= self.flush_threshold:
+            self._wakeup.set()
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return
+            self._dirty.add(key)
+
+    def evict(self, predicate):
+        """Remove every entry for which predicate(key, value) is true; return them."""
+        with self._lock:
+            evicted = [(k, v) for k, v in self._data.items() if predicate(k, v)]
+            if not evicted:
+                return evicted
+            for key, _ in evicted:
+                del self._data[key]
+                self._dirty.add(key)
+            # dicts never shrink on delete; rebuild once a sizeable share is gone
+            if len(evicted) * 4 >= len(self._data):
+                self._data = dict(self._data)
+        return evicted
+
+    # =================== FLUSHING ===================
+    def start(self):
+        """Start the background flush thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"flush:{os.path.basename(self.path)}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[persistence] Flush error for {self.path}: {e}")
+
+    def flush(self):
+        """Write pending changes to disk. Safe to call from any thread."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                dirty = self._dirty
+                self._dirty = set()
+                changed = {key: self._data[key] for key in dirty if key in self._data}
+
+            for key in dirty:
+                if key in changed:
+                    self._fragments[key] = json.dumps(self.encode(changed[key]), separators=(",", ":"))
+                else:
+                    self._fragments.pop(key, None)
+
+            body = ",\n".join(f"{json.dumps(k)}:{v}" for k, v in self._fragments.items())
+            temp_file = self.path + ".tmp"
+            try:
+                with open(temp_file, "w") as f:
+                    f.write("{\n" + body + "\n}")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.path)
+            except Exception:
+                # Put the keys back so the next flush retries them
+                with self._lock:
+                    self._dirty |= dirty
+                raise
+
+    def close(self):
+        """Stop the flush thread and write anything still pending."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        _open_stores.discard(self)
+
+
+def register(store):
+    """Include another store (anything with .path and .flush()) in flush_all()."""
+    _open_stores.add(store)
+
+
+def flush_all():
+    """Flush every open store. Blocking; run it in a thread from async code."""
+    for store in list(_open_stores):
+        try:
+            store.flush()
+        except Exception as e:
+            print(f"[persistence] Flush error for {store.path}: {e}")
@@ -0,0 +1,211 @@
+# quota.py
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+from rate_limit import SlidingWindowLimiter, TokenBucket
+from storage import UsageRecord
+
+load_dotenv()
+# Defaults when a guild sets no "daily_limit" / "cooldown" of its own
+DAILY_LIMIT = int(os.getenv("LIKE_DAILY_LIMIT", "1"))
+COOLDOWN_SECONDS = int(os.getenv("LIKE_COOLDOWN", "30"))
+# Requests a user may make within one cooldown window
+COOLDOWN_BURST = int(os.getenv("LIKE_COOLDOWN_BURST", "1"))
+# Upstream budget shared by all guilds: likes/second per region (0 = unlimited),
+# with per-region overrides, e.g. "br:20,ind:10"
+REGION_RATE = float(os.getenv("LIKE_REGION_RATE", "10"))
+REGION_BURST = float(os.getenv("LIKE_REGION_BURST", "20"))
+REGION_RATES = os.getenv("LIKE_REGION_RATES", "")
+
+
+def _parse_region_rates(raw: str) -> dict:
+    rates = {}
+    for part in raw.split(","):
+        if ":" in part:
+            region, rate = part.split(":", 1)
+            try:
+                rates[region.strip().lower()] = float(rate)
+            except ValueError:
+                print(f"⚠️ Ignoring invalid region rate '{part}'")
+    return rates
+
+
+def _today() -> int:
+    return datetime.now(timezone.utc).date().toordinal()
+
+
+class QuotaExceeded(Exception):
+    """
+    A request the quotas don't allow right now. `reason` is "cooldown",
+    "daily_limit" or "region_budget"; `retry_after` is in seconds.
+    """
+
+    def __init__(self, reason: str, retry_after: float = 0.0, limit=None):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.limit = limit
+
+
+class Reservation:
+    """What reserve() took, so refund() can give exactly that back."""
+
+    __slots__ = ("user_id", "region", "day", "cooldown_stamp", "last_used")
+
+    def __init__(self, user_id, region, day, cooldown_stamp, last_used):
+        self.user_id = user_id
+        self.region = region          # None when no upstream budget was taken
+        self.day = day                # None when the daily quota wasn't counted
+        self.cooldown_stamp = cooldown_stamp
+        self.last_used = last_used    # stored cooldown timestamp before this reservation
+
+
+class QuotaEngine:
+    """
+    Decides whether a like may go upstream, and reserves the capacity it uses.
+
+    - cooldown: sliding window per user on monotonic time; the last use is
+      also written to the state store, so a restart doesn't reset it
+    - daily quota: per UTC day, persisted through the state store; the limit
+      comes from the member's roles (role_limits, premium role = unlimited),
+      then the guild's daily_limit, then LIKE_DAILY_LIMIT
+    - upstream budget: one token bucket per known region (`regions` plus the
+      LIKE_REGION_RATES overrides), shared by every guild; any other region
+      is rejected with ValueError
+
+    Every check is O(1). Callers refund() the reservation when the like
+    wasn't delivered, so only successful likes count against the daily quota.
+    """
+
+    def __init__(self, store, daily_limit: int = DAILY_LIMIT, cooldown: int = COOLDOWN_SECONDS,
+                 cooldown_burst: int = COOLDOWN_BURST, region_rate: float = REGION_RATE,
+                 region_burst: float = REGION_BURST, region_rates: dict | None = None, regions=()):
+        self.store = store
+        self.daily_limit = daily_limit
+        self.cooldown = cooldown
+        self.region_rate = region_rate
+        self.region_burst = region_burst
+        self.region_rates = region_rates if region_rates is not None else _parse_region_rates(REGION_RATES)
+        self.cooldowns = SlidingWindowLimiter(cooldown_burst)
+        self._longest_cooldown = cooldown
+        self._buckets = {}   # region -> TokenBucket, or None when unlimited (fixed set)
+        for region in {r.lower() for r in regions} | set(self.region_rates):
+            rate = self.region_rates.get(region, self.region_rate)
+            self._buckets[region] = TokenBucket(rate, max(self.region_burst, rate)) if rate > 0 else None
+
+    def cooldown_horizon(self) -> int:
+        """
+        Longest cooldown any guild can apply: the default, every guild's
+        configured override and anything seen since start. Stored cooldowns
+        older than this are dead. Reads the store: call it off the event loop.
+        """
+        configured = self.store.longest_guild_cooldown()
+        return max(self._longest_cooldown, configured or 0)
+
+    def limit_for(self, settings, role_ids) -> int | None:
+        """Daily like limit of a member (None = unlimited; a configured 0 means unlimited too)."""
+        if settings.premium_role is not None and settings.premium_role in role_ids:
+            return None
+        limits = [limit for role_id, limit in settings.role_limits.items() if role_id in role_ids]
+        if limits:
+            return None if 0 in limits else max(limits)
+        limit = settings.daily_limit if settings.daily_limit is not None else self.daily_limit
+        return limit or None
+
+    def cooldown_for(self, settings) -> int:
+        cooldown = settings.cooldown if settings.cooldown is not None else self.cooldown
+        # prune() must not forget a user still inside a guild's longer window
+        self._longest_cooldown = max(self._longest_cooldown, cooldown)
+        return cooldown
+
+    def _bucket(self, region: str):
+        # Regions come from user input: never create state for an unknown one
+        try:
+            return self._buckets[region.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown region '{region}'") from None
+
+    # =================== RESERVATIONS ===================
+    def reserve(self, user_id: str, settings, role_ids=frozenset(), region: str | None = None,
+                count_daily: bool = True) -> Reservation:
+        """
+        Check every quota, then take them all at once. Raises QuotaExceeded
+        without taking anything if one of them is exhausted.
+        """
+        window = self.cooldown_for(settings)
+        last_used = self.store.get_cooldown(user_id)
+        if user_id not in self.cooldowns and last_used is not None:
+            # First request since a restart: resume the window from the stored wall-clock time
+            age = max(time.time() - last_used, 0.0)
+            if age < window:
+                self.cooldowns.seed(user_id, time.monotonic() - age)
+        wait = self.cooldowns.retry_after(user_id, window)
+        if wait > 0:
+            raise QuotaExceeded("cooldown", retry_after=wait)
+
+        day = used = None
+        if count_daily:
+            limit = self.limit_for(settings, role_ids)
+            if limit is not None:
+                day = _today()
+                usage = self.store.get_daily_usage(user_id)
+                used = usage.used if usage is not None and usage.day == day else 0
+                if used >= limit:
+                    raise QuotaExceeded("daily_limit", limit=limit)
+
+        if region is not None:
+            bucket = self._bucket(region)
+            if bucket is None:
+                region = None
+            elif not bucket.try_acquire():
+                raise QuotaExceeded("region_budget", retry_after=1 / bucket.rate)
+
+        if day is not None:
+            # Stored records are read-only snapshots: write a fresh one
+            self.store.set_daily_usage(user_id, UsageRecord(day, used + 1))
+        stamp = self.cooldowns.hit(user_id)
+        self.store.set_cooldown(user_id, time.time())
+        return Reservation(user_id, region, day, stamp, last_used)
+
+    def refund(self, reservation: Reservation, upstream_reached: bool = False):
+        """
+        Give back a reservation whose like wasn't delivered. The daily quota
+        always comes back; the cooldown and the region token only when the
+        upstream API was never called, so failing calls can't be retried at
+        full speed against an API that is already struggling.
+        """
+        if not upstream_reached:
+            self.cooldowns.undo(reservation.user_id, reservation.cooldown_stamp)
+            # 0.0 is older than any cutoff: compaction drops it
+            self.store.set_cooldown(reservation.user_id, reservation.last_used or 0.0)
+            if reservation.region is not None:
+                self.refund_upstream(reservation.region)
+        if reservation.day is not None:
+            usage = self.store.get_daily_usage(reservation.user_id)
+            if usage is not None and usage.day == reservation.day and usage.used > 0:
+                self.store.set_daily_usage(reservation.user_id, UsageRecord(usage.day, usage.used - 1))
+
+    # =================== UPSTREAM BUDGET ===================
+    async def acquire_upstream(self, region: str, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for one upstream call in `region`."""
+        bucket = self._bucket(region)
+        if bucket is None or bucket.try_acquire():
+            return True
+        try:
+            await asyncio.wait_for(bucket.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def refund_upstream(self, region: str):
+        bucket = self._bucket(region)
+        if bucket is not None:
+            bucket.refund()
+
+    def prune(self) -> int:
+        """Forget users whose cooldown window has passed."""
+        return self.cooldowns.prune(self._longest_cooldown)
@@ -0,0 +1,89 @@
+# rate_limit.py
+import asyncio
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Classic token bucket on monotonic time: `rate` tokens per second,
+    holding at most `capacity`. acquire() waits in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available right now; never waits."""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    async def acquire(self, tokens: float = 1):
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def refund(self, tokens: float = 1):
+        """Give back tokens taken for work that never happened."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+class SlidingWindowLimiter:
+    """
+    At most `limit` hits per key within any `window` seconds, on monotonic
+    time. Each key keeps only its last `limit` hit times, so checks are O(1).
+    """
+
+    def __init__(self, limit: int = 1):
+        self.limit = max(int(limit), 1)
+        self._hits = {}   # key -> deque of monotonic hit times
+
+    def retry_after(self, key, window: float) -> float:
+        """Seconds until `key` may hit again (0 when allowed now)."""
+        hits = self._hits.get(key)
+        if hits is None or len(hits) < self.limit:
+            return 0.0
+        return max(hits[0] + window - time.monotonic(), 0.0)
+
+    def hit(self, key) -> float:
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = deque(maxlen=self.limit)
+        stamp = time.monotonic()
+        hits.append(stamp)
+        return stamp
+
+    def __contains__(self, key) -> bool:
+        return key in self._hits
+
+    def seed(self, key, stamp: float):
+        """Restore a hit recorded before a restart (`stamp` in monotonic time)."""
+        if key not in self._hits:
+            self._hits[key] = deque([stamp], maxlen=self.limit)
+
+    def undo(self, key, stamp: float):
+        """Forget one hit recorded by hit()."""
+        hits = self._hits.get(key)
+        if hits is not None and stamp in hits:
+            hits.remove(stamp)
+
+    def prune(self, window: float) -> int:
+        """Drop keys whose every hit is older than `window`; returns how many."""
+        cutoff = time.monotonic() - window
+        stale = [key for key, hits in self._hits.items() if not hits or hits[-1] <= cutoff]
+        for key in stale:
+            del self._hits[key]
+        return len(stale)
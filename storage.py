@@ -0,0 +1,376 @@
+# storage.py
+import json
+import os
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import date
+
+from persistence import WriteBehindJSONStore
+from guild_config import CONFIG_FILE, GuildConfigCache, GuildSettings
+
+DAILY_FILE = "daily_usage.json"
+COOLDOWN_FILE = "cooldowns.json"
+STATE_DB = os.getenv("STATE_DB", "state.db")
+STATE_BACKEND = os.getenv("STATE_BACKEND", "json").lower()
+
+
+class UsageRecord:
+    """One user's daily usage: UTC day as a date ordinal plus a counter."""
+
+    __slots__ = ("day", "used")
+
+    def __init__(self, day: int, used: int):
+        self.day = day
+        self.used = used
+
+    @classmethod
+    def from_json(cls, raw: dict):
+        return cls(date.fromisoformat(raw["last_reset"]).toordinal(), raw["used"])
+
+    def to_json(self) -> dict:
+        return {"last_reset": date.fromordinal(self.day).isoformat(), "used": self.used}
+
+    def __repr__(self):
+        return f"UsageRecord(day={self.day}, used={self.used})"
+
+
+def _entry_size(key, value) -> int:
+    """Rough bytes held by one evicted dict entry (key, value, hash slot)."""
+    return sys.getsizeof(key) + sys.getsizeof(value) + 3 * 8
+
+
+class StateStore(ABC):
+    """
+    Storage interface for guild config, daily usage and cooldowns.
+
+    Returned guild configs and usage records are read-only snapshots:
+    build a new value and pass it back through the matching set_* method.
+    Backends must implement every abstract method; the lifecycle hooks are
+    optional.
+    """
+
+    # --- guild config ---
+    @abstractmethod
+    def get_guild_config(self, guild_id: str) -> dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_guild_config(self, guild_id: str, config: dict):
+        raise NotImplementedError
+
+    def get_guild_settings(self, guild_id: str) -> GuildSettings:
+        """Parsed config (int ids, frozenset of channels) for permission checks."""
+        return GuildSettings(self.get_guild_config(guild_id))
+
+    # --- daily usage: UsageRecord (day ordinal + counter) ---
+    @abstractmethod
+    def get_daily_usage(self, user_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_daily_usage(self, user_id: str, usage: UsageRecord):
+        raise NotImplementedError
+
+    # --- cooldowns: unix timestamp of the last accepted use ---
+    @abstractmethod
+    def get_cooldown(self, user_id: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_cooldown(self, user_id: str, timestamp: float):
+        raise NotImplementedError
+
+    @abstractmethod
+    def longest_guild_cooldown(self):
+        """Longest "cooldown" override across all guild configs, or None."""
+        raise NotImplementedError
+
+    # --- maintenance ---
+    @abstractmethod
+    def compact(self, today: int, cooldown_cutoff: float):
+        """
+        Drop usage records from before `today` (a date ordinal) and cooldowns
+        older than `cooldown_cutoff`. Returns (usage_evicted, cooldowns_evicted,
+        approx_bytes_reclaimed).
+        """
+        raise NotImplementedError
+
+    # --- lifecycle ---
+    def start(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JSONStateStore(StateStore):
+    """The historical layout: like_channels.json + daily_usage.json, plus cooldowns.json."""
+
+    def __init__(self, config_file: str = CONFIG_FILE, daily_file: str = DAILY_FILE,
+                 cooldown_file: str = COOLDOWN_FILE):
+        self.config_file = config_file
+        # Hot-reloaded when the file is edited by hand; admin changes are saved debounced
+        self.guild_configs = GuildConfigCache(config_file)
+        self.daily_usage = WriteBehindJSONStore(
+            daily_file, encode=UsageRecord.to_json, decode=UsageRecord.from_json
+        )
+        # user_id -> unix timestamp, written behind like daily usage so it survives restarts
+        self.cooldowns = WriteBehindJSONStore(cooldown_file)
+
+    def get_guild_config(self, guild_id):
+        return self.guild_configs.get_raw(guild_id)
+
+    def set_guild_config(self, guild_id, config):
+        self.guild_configs.set(guild_id, config)
+
+    def get_guild_settings(self, guild_id):
+        return self.guild_configs.get(guild_id)
+
+    def get_daily_usage(self, user_id):
+        return self.daily_usage.get(user_id)
+
+    def set_daily_usage(self, user_id, usage):
+        self.daily_usage.set(user_id, usage)
+
+    def get_cooldown(self, user_id):
+        return self.cooldowns.get(user_id)
+
+    def set_cooldown(self, user_id, timestamp):
+        self.cooldowns.set(user_id, timestamp)
+
+    def longest_guild_cooldown(self):
+        return self.guild_configs.longest_cooldown()
+
+    def compact(self, today, cooldown_cutoff):
+        stale_usage = self.daily_usage.evict(lambda _, record: record.day < today)
+        stale_cooldowns = self.cooldowns.evict(lambda _, timestamp: timestamp < cooldown_cutoff)
+        reclaimed = sum(_entry_size(k, v) for k, v in stale_usage + stale_cooldowns)
+        return len(stale_usage), len(stale_cooldowns), reclaimed
+
+    def start(self):
+        self.daily_usage.start()
+        self.cooldowns.start()
+
+    def flush(self):
+        self.guild_configs.flush()
+        self.daily_usage.flush()
+        self.cooldowns.flush()
+
+    def close(self):
+        self.guild_configs.close()
+        self.daily_usage.close()
+        self.cooldowns.close()
+
+
+class SQLiteStateStore(StateStore):
+    """
+    One row per guild/user in a WAL-mode SQLite database.
+
+    Every operation is a primary-key lookup or upsert on a fixed SQL string,
+    so sqlite3's statement cache keeps them prepared.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id TEXT PRIMARY KEY,
+            data     TEXT NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS daily_usage (
+            user_id    TEXT PRIMARY KEY,
+            last_reset TEXT NOT NULL,
+            used       INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS cooldowns (
+            user_id   TEXT PRIMARY KEY,
+            last_used REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_daily_usage_last_reset ON daily_usage (last_reset);
+        CREATE INDEX IF NOT EXISTS idx_cooldowns_last_used ON cooldowns (last_used);
+    """
+
+    GET_GUILD = "SELECT data FROM guild_config WHERE guild_id = ?"
+    ALL_GUILDS = "SELECT data FROM guild_config"
+    PUT_GUILD = (
+        "INSERT INTO guild_config (guild_id, data) VALUES (?, ?) "
+        "ON CONFLICT(guild_id) DO UPDATE SET data = excluded.data"
+    )
+    GET_USAGE = "SELECT last_reset, used FROM daily_usage WHERE user_id = ?"
+    PUT_USAGE = (
+        "INSERT INTO daily_usage (user_id, last_reset, used) VALUES (?, ?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET last_reset = excluded.last_reset, used = excluded.used"
+    )
+    GET_COOLDOWN = "SELECT last_used FROM cooldowns WHERE user_id = ?"
+    PUT_COOLDOWN = (
+        "INSERT INTO cooldowns (user_id, last_used) VALUES (?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET last_used = excluded.last_used"
+    )
+    EXPIRE_USAGE = "DELETE FROM daily_usage WHERE last_reset < ?"
+    EXPIRE_COOLDOWNS = "DELETE FROM cooldowns WHERE last_used < ?"
+
+    def __init__(self, path: str = STATE_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        # guild_id -> GuildSettings; configs only change through set_guild_config
+        self._settings = {}
+        # isolation_level=None: each statement commits on its own, which in
+        # WAL mode with synchronous=NORMAL is an append to the log, not an fsync.
+        self.conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False, cached_statements=64
+        )
+        # auto_vacuum only takes effect on a fresh database; it lets compact() hand pages back
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def _one(self, sql, params):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def _write(self, sql, params):
+        with self._lock:
+            self.conn.execute(sql, params)
+
+    def get_guild_config(self, guild_id):
+        row = self._one(self.GET_GUILD, (guild_id,))
+        return json.loads(row[0]) if row else {}
+
+    def set_guild_config(self, guild_id, config):
+        self._write(self.PUT_GUILD, (guild_id, json.dumps(config)))
+        self._settings[guild_id] = GuildSettings(config)
+
+    def get_guild_settings(self, guild_id):
+        settings = self._settings.get(guild_id)
+        if settings is None:
+            settings = self._settings[guild_id] = GuildSettings(self.get_guild_config(guild_id))
+        return settings
+
+    def get_daily_usage(self, user_id):
+        row = self._one(self.GET_USAGE, (user_id,))
+        return UsageRecord(date.fromisoformat(row[0]).toordinal(), row[1]) if row else None
+
+    def set_daily_usage(self, user_id, usage):
+        self._write(self.PUT_USAGE, (user_id, date.fromordinal(usage.day).isoformat(), usage.used))
+
+    def get_cooldown(self, user_id):
+        row = self._one(self.GET_COOLDOWN, (user_id,))
+        return row[0] if row else None
+
+    def set_cooldown(self, user_id, timestamp):
+        self._write(self.PUT_COOLDOWN, (user_id, timestamp))
+
+    def longest_guild_cooldown(self):
+        with self._lock:
+            rows = self.conn.execute(self.ALL_GUILDS).fetchall()
+        # Parsed like every other read, so odd values ("3600", junk) behave the same
+        cooldowns = [GuildSettings(json.loads(data)).cooldown for data, in rows]
+        return max((c for c in cooldowns if c is not None), default=None)
+
+    def compact(self, today, cooldown_cutoff):
+        with self._lock:
+            before = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            usage = self.conn.execute(
+                self.EXPIRE_USAGE, (date.fromordinal(today).isoformat(),)
+            ).rowcount
+            cooldowns = self.conn.execute(self.EXPIRE_COOLDOWNS, (cooldown_cutoff,)).rowcount
+            self.conn.execute("PRAGMA incremental_vacuum")
+            after = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        return usage, cooldowns, max(before - after, 0) * page_size
+
+    def flush(self):
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+
+
+def _remove_db(path: str):
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def _load_json(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def migrate_json_to_sqlite(db_path: str = STATE_DB, config_file: str = CONFIG_FILE,
+                           daily_file: str = DAILY_FILE, cooldown_file: str = COOLDOWN_FILE):
+    """
+    Copy like_channels.json, daily_usage.json and cooldowns.json into a new
+    SQLite state database. Everything goes into `db_path`.tmp in one
+    transaction and is moved into place only once complete: on any error
+    the temp database is deleted and the error re-raised, so nothing half
+    migrated is ever left at `db_path`.
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists; move it away to migrate again")
+    temp_path = db_path + ".tmp"
+    _remove_db(temp_path)  # leftover of an interrupted run
+    store = SQLiteStateStore(temp_path)
+    guilds = users = cooldowns = 0
+    try:
+        with store._lock:
+            store.conn.execute("BEGIN")
+            try:
+                for guild_id, config in _load_json(config_file).get("servers", {}).items():
+                    store.conn.execute(store.PUT_GUILD, (guild_id, json.dumps(config)))
+                    guilds += 1
+                for user_id, entry in _load_json(daily_file).items():
+                    # Parsed, so a malformed entry fails the migration instead of the bot later
+                    usage = UsageRecord.from_json(entry)
+                    store.conn.execute(
+                        store.PUT_USAGE, (user_id, date.fromordinal(usage.day).isoformat(), usage.used)
+                    )
+                    users += 1
+                for user_id, timestamp in _load_json(cooldown_file).items():
+                    store.conn.execute(store.PUT_COOLDOWN, (user_id, float(timestamp)))
+                    cooldowns += 1
+                store.conn.execute("COMMIT")
+            except BaseException:
+                store.conn.execute("ROLLBACK")
+                raise
+        store.close()
+    except BaseException:
+        store.conn.close()
+        _remove_db(temp_path)
+        raise
+    os.replace(temp_path, db_path)
+    _remove_db(temp_path)  # -wal/-shm, if the close left any
+    print(
+        f"✅ Migrated {guilds} guild configs, {users} daily usage entries and "
+        f"{cooldowns} cooldowns into {db_path}"
+    )
+
+
+def open_state_store(backend: str = STATE_BACKEND) -> StateStore:
+    """Build the store selected by STATE_BACKEND ("json" or "sqlite")."""
+    if backend == "sqlite":
+        json_files = (CONFIG_FILE, DAILY_FILE, COOLDOWN_FILE)
+        if not os.path.exists(STATE_DB) and any(os.path.exists(path) for path in json_files):
+            print(f"⏳ {STATE_DB} not found, importing existing JSON state...")
+            # A failure leaves no STATE_DB behind, so the next start retries the import
+            migrate_json_to_sqlite()
+        return SQLiteStateStore()
+    if backend != "json":
+        print(f"⚠️ Unknown STATE_BACKEND '{backend}', falling back to json")
+    return JSONStateStore()
+
+
+if __name__ == "__main__":
+    # python storage.py  ->  one-shot import of the JSON files into STATE_DB
+    migrate_json_to_sqlite()
@@ -1,30 +1,52 @@
 # token_manager.py
 import os
 import json
-import requests  # Needed for notify_discord
+import hashlib
 from base64 import b64encode
 from datetime import datetime, timedelta, timezone
 import asyncio
+import math
+import random
+import time
 from dotenv import load_dotenv
 import aiohttp
+from http_client import AUTH_TIMEOUT, GITHUB_TIMEOUT
+from rate_limit import TokenBucket
+from notifier import notifier
+from token_records import TokenRecords
+from account_source import LOCAL_CONFIG_DIR, get_account_index
+import metrics
 
 load_dotenv()
 
 # --- Configuration ---
-GITHUB_API = "https://api.github.com"
+# Overridable so load tests can point at a local stand-in (benchmarks/stubs.py)
+GITHUB_API = os.getenv("GITHUB_API", "https://api.github.com").rstrip("/")
 BRANCH = "main"
 ZONES = ["br", "ind", "bd"]
 
-LOCAL_CONFIG_DIR = "configs"
 
 REPO_TOKENS = os.getenv("REPO_TOKENS")
 AUTH_URL = os.getenv("AUTH_URL")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
-WEEBOOK_URL = os.getenv("WEEBOOK_URL")
 
 STALE_TOKEN_HOURS = 6      
+CHECK_RETRY_SECONDS = 300  # when a zone's commit time is unknown
+# Failed refreshes are retried after CHECK_RETRY_SECONDS, doubling per
+# consecutive failure up to MAX_RETRY_SECONDS
+MAX_RETRY_SECONDS = 3600
+# Rolling refresh: each zone is refreshed every STALE_TOKEN_HOURS / ROLLING_SLICES,
+# re-authenticating only expiring accounts plus the oldest 1/ROLLING_SLICES share
+ROLLING_SLICES = max(int(os.getenv("ROLLING_SLICES", "6")), 1)
+REFRESH_CYCLE = timedelta(hours=STALE_TOKEN_HOURS) / ROLLING_SLICES
+EXPIRY_MARGIN = timedelta(minutes=10)
 MAX_TOKENS = 110           
 
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "10"))
+AUTH_RATE_PER_SEC = float(os.getenv("AUTH_RATE_PER_SEC", "5"))
+AUTH_MAX_RETRIES = 3
+AUTH_BACKOFF_BASE = 0.5
+
 HEADERS = {
     "Authorization": f"token {GITHUB_TOKEN}",
     "Accept": "application/vnd.github.v3+json"
@@ -33,49 +55,82 @@ HEADERS = {
 # Store last commit times for each zone
 last_commit_times = {zone: None for zone in ZONES}
 
+# Refresh state per zone: "idle" or "refreshing", outcome timestamps and
+# the number of consecutive failed refreshes
+zone_states = {
+    zone: {"state": "idle", "last_started": None, "last_success": None, "last_error": None, "failures": 0}
+    for zone in ZONES
+}
+_refresh_tasks = {}
+_supervisor_task = None
+
+# Per-account token records, loaded on first refresh of each zone
+_zone_records = {}
+
+# Last known git blob SHA of each token file on GitHub, keyed by repo path
+_remote_blob_shas = {}
+
+# ETag of the last commits response per zone, for conditional requests
+_commit_etags = {zone: None for zone in ZONES}
+# Set whenever a refresh ends, so the validity loop can reschedule
+_schedule_changed = asyncio.Event()
+
+# Shared across zones so concurrent refreshes stay polite toward AUTH_URL
+auth_bucket = TokenBucket(AUTH_RATE_PER_SEC)
+
 
 def notify_discord(message: str):
-    """Send a notification to Discord via webhook."""
-    if not WEEBOOK_URL:
-        print("[Discord] Notification skipped.")
-        return
-    try:
-        requests.post(WEEBOOK_URL, json={"content": message}, timeout=5)
-    except Exception as e:
-        print(f"[Discord] Error: {e}")
+    """Queue a notification for the Discord webhook (never blocks)."""
+    notifier.notify(message)
+
+
+def git_blob_sha(content: str) -> str:
+    """SHA GitHub reports for a file with this content (git's blob hash)."""
+    data = content.encode()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
 
 
-async def get_github_file_content(session, repo: str, path: str):
-    """Get file content from GitHub repository and return (content, sha)."""
+async def get_github_file_sha(session, repo: str, path: str):
+    """Get the blob SHA of a file from the contents API metadata (no raw download)."""
     url = f"{GITHUB_API}/repos/{repo}/contents/{path}"
-    async with session.get(url, headers=HEADERS) as response:
+    async with session.get(url, headers=HEADERS, timeout=GITHUB_TIMEOUT) as response:
+        metrics.record_github(response, "contents")
         if response.status == 200:
-            file_info = await response.json()
-            # Download raw content
-            download_url = file_info.get('download_url')
-            if download_url:
-                async with session.get(download_url, timeout=10) as content_response:
-                    if content_response.status == 200:
-                        content = await content_response.text()
-                        return content, file_info['sha']
-            return None, file_info.get('sha')
-    return None, None
-
-
-async def get_github_file_commit_info(session, repo: str, path: str):
-    """Get the last commit date for a given file on GitHub."""
-    url = f"{GITHUB_API}/repos/{repo}/commits?path={path}&page=1&per_page=1"
-    async with session.get(url, headers=HEADERS) as response:
+            sha = (await response.json()).get('sha')
+            _remote_blob_shas[path] = sha
+            return sha
+    return None
+
+
+async def get_github_file_commit_info(session, zone: str):
+    """
+    Get the last commit date of a zone's token file on GitHub.
+
+    Sends If-None-Match with the previous ETag: a 304 doesn't count toward
+    the rate limit and means the cached last_commit_times entry still holds.
+    """
+    path = f"tokens/token_{zone}.json"
+    url = f"{GITHUB_API}/repos/{REPO_TOKENS}/commits?path={path}&page=1&per_page=1"
+    headers = HEADERS
+    if _commit_etags[zone] and last_commit_times[zone]:
+        headers = {**HEADERS, "If-None-Match": _commit_etags[zone]}
+
+    async with session.get(url, headers=headers, timeout=GITHUB_TIMEOUT) as response:
+        metrics.record_github(response, "commits")
+        if response.status == 304:
+            return last_commit_times[zone]
         if response.status == 200:
             commits = await response.json()
             if commits:
                 date_str = commits[0]['commit']['committer']['date']
-                return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                last_commit_times[zone] = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                _commit_etags[zone] = response.headers.get("ETag")
+                return last_commit_times[zone]
     return None
 
 
 async def update_github_file(session, repo: str, path: str, content: str, sha: str | None):
-    """Update a file on GitHub repository."""
+    """Update a file on GitHub repository. Returns True on success."""
     url = f"{GITHUB_API}/repos/{repo}/contents/{path}"
     data = {
         "message": f"Auto update {path} @ {datetime.now(timezone.utc).isoformat()}",
@@ -84,29 +139,60 @@ async def update_github_file(session, repo: str, path: str, content: str, sha: s
         "branch": BRANCH
     }
     try:
-        async with session.put(url, headers=HEADERS, data=json.dumps(data)) as r:
-            return r.status in [200, 201]
+        async with session.put(url, headers=HEADERS, data=json.dumps(data), timeout=GITHUB_TIMEOUT) as r:
+            metrics.record_github(r, "contents_put")
+            if r.status in [200, 201]:
+                _remote_blob_shas[path] = (await r.json()).get("content", {}).get("sha")
+                return True
+            # Likely a stale SHA (409/422): look it up again next time
+            _remote_blob_shas.pop(path, None)
+            return False
     except Exception as e:
+        _remote_blob_shas.pop(path, None)
         print(f"Update error for {path}: {e}")
         return False
 
 
-async def get_auth_token(session, uid: str, password: str):
-    """Get auth token from AUTH_URL using uid and password."""
+async def _request_auth_token(session, uid: str, password: str):
+    """One auth attempt. Returns (token, retryable)."""
     try:
-        async with session.get(AUTH_URL, params={"uid": uid, "password": password}, timeout=10) as res:
+        async with session.get(AUTH_URL, params={"uid": uid, "password": password}, timeout=AUTH_TIMEOUT) as res:
             if res.status == 200:
-                return (await res.json()).get("token")
-            return None
+                return (await res.json()).get("token"), False
+            # Rate limited or upstream trouble: worth another try
+            return None, res.status == 429 or res.status >= 500
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None, True
     except Exception:
-        return None
+        return None, False
+
+
+async def get_auth_token(session, uid: str, password: str):
+    """Get auth token from AUTH_URL using uid and password, retrying transient failures."""
+    for attempt in range(AUTH_MAX_RETRIES + 1):
+        await auth_bucket.acquire()
+        token, retryable = await _request_auth_token(session, uid, password)
+        if token or not retryable or attempt == AUTH_MAX_RETRIES:
+            return token
+        # Exponential backoff with jitter
+        await asyncio.sleep(AUTH_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, AUTH_BACKOFF_BASE))
+    return None
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
 
 
-async def refresh_zone(session, zone: str):
+async def refresh_zone(session, zone: str) -> bool:
+    """Regenerate and publish the tokens of one zone. Returns True on success."""
     zone = zone.lower()
     if zone not in ZONES:
         notify_discord(f"❌ Unknown zone: {zone}")
-        return
+        return False
 
     try:
         config_path = os.path.join(LOCAL_CONFIG_DIR, f"config_{zone}.json")
@@ -114,51 +200,140 @@ async def refresh_zone(session, zone: str):
         
         notify_discord(f"⏳ Refreshing `{zone}` tokens...")
 
-        # Check if local config exists
-        if not os.path.exists(config_path):
+        # Validated accounts, re-parsed only when the config file changed
+        index = await asyncio.to_thread(get_account_index, zone)
+        if index is None:
             notify_discord(f"❌ Config file not found: {config_path}")
-            return
-
-        # Load local config accounts
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
+            return False
 
         # Limit accounts to MAX_TOKENS
-        accounts = config_data[:MAX_TOKENS]
+        accounts = index.accounts[:MAX_TOKENS]
+
+        records = _zone_records.get(zone)
+        if records is None:
+            records = _zone_records[zone] = TokenRecords(zone)
+        now = time.time()
+        due = records.due(accounts, now, (REFRESH_CYCLE + EXPIRY_MARGIN).total_seconds(), ROLLING_SLICES)
 
-        tokens = []
-        count_success = 0
-        count_fail = 0
+        semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        latencies = []
         processed_count = 0
+        started = time.perf_counter()
 
-        # Generate tokens for accounts
-        for acc in accounts:
-            if 'uid' in acc and 'password' in acc:
-                processed_count += 1
+        async def generate(acc):
+            nonlocal processed_count
+            async with semaphore:
+                t0 = time.perf_counter()
                 token = await get_auth_token(session, acc['uid'], acc['password'])
-                if token:
-                    tokens.append({"token": token})
-                    count_success += 1
-                else:
-                    count_fail += 1
+                latencies.append(time.perf_counter() - t0)
+            processed_count += 1
             if processed_count % 20 == 0:
-                notify_discord(f"🔄 `{zone}`: {processed_count} tokens traités sur {len(accounts)}.")
-
-        notify_discord(f"🔄 `{zone}`: {count_success} tokens OK, {count_fail} failed.")
-
-        # Get current SHA of token file
-        _, sha = await get_github_file_content(session, REPO_TOKENS, token_path)
+                notify_discord(f"🔄 `{zone}`: {processed_count} tokens traités sur {len(due)}.")
+            return token
+
+        # Re-authenticate only the due accounts
+        results = await asyncio.gather(*(generate(acc) for acc in due))
+        count_success = count_fail = 0
+        for acc, token in zip(due, results):
+            if token:
+                records.record_success(acc['uid'], token, time.time())
+                count_success += 1
+            else:
+                records.record_failure(acc['uid'])
+                count_fail += 1
+        await asyncio.to_thread(records.save)
+
+        # Publish every still-valid token, in config order
+        tokens = [{"token": token} for token in records.valid_tokens(accounts, time.time())]
+
+        latencies.sort()
+        notify_discord(
+            f"🔄 `{zone}`: {count_success}/{len(due)} renewed, {count_fail} failed, "
+            f"{len(tokens)}/{len(accounts)} valid "
+            f"in {time.perf_counter() - started:.1f}s "
+            f"(p50 {_percentile(latencies, 50):.2f}s, p95 {_percentile(latencies, 95):.2f}s, "
+            f"p99 {_percentile(latencies, 99):.2f}s)."
+        )
+
+        content = json.dumps(tokens, indent=2)
+
+        # Get current SHA of token file (cached from the last read or write)
+        sha = _remote_blob_shas.get(token_path)
+        if sha is None:
+            sha = await get_github_file_sha(session, REPO_TOKENS, token_path)
+
+        # Same blob already on GitHub: nothing to commit
+        if sha is not None and sha == git_blob_sha(content):
+            last_commit_times[zone] = datetime.now(timezone.utc)
+            notify_discord(f"✅ `{token_path}` unchanged ({len(tokens)} tokens), skipping commit.")
+            return True
 
         # Update token file on GitHub
-        updated = await update_github_file(session, REPO_TOKENS, token_path, json.dumps(tokens, indent=2), sha)
+        updated = await update_github_file(session, REPO_TOKENS, token_path, content, sha)
 
         if updated:
             last_commit_times[zone] = datetime.now(timezone.utc)
             notify_discord(f"✅ `{token_path}` updated with {len(tokens)} tokens.")
-        else:
-            notify_discord(f"⚠️ Failed to update `{token_path}`.")
+            return True
+        notify_discord(f"⚠️ Failed to update `{token_path}`.")
+        return False
     except Exception as e:
         notify_discord(f"❌ Error in zone `{zone}`: {str(e)}")
+        return False
+
+
+# =================== REFRESH SUPERVISOR ===================
+async def _supervised_refresh(session, zone: str):
+    state = zone_states[zone]
+    state["state"] = "refreshing"
+    state["last_started"] = datetime.now(timezone.utc)
+    ok = False
+    try:
+        with metrics.TOKEN_REFRESH_DURATION.time(zone=zone):
+            ok = await refresh_zone(session, zone)
+    finally:
+        # An exception counts as a failure too, so it gets the same backoff
+        metrics.TOKEN_REFRESH.inc(zone=zone, result="success" if ok else "fail")
+        if ok:
+            state["last_success"] = datetime.now(timezone.utc)
+            state["failures"] = 0
+        else:
+            state["last_error"] = datetime.now(timezone.utc)
+            state["failures"] += 1
+        state["state"] = "idle"
+        _schedule_changed.set()
+
+
+def zone_freshness(zone: str, now=None) -> str:
+    """
+    "fresh", "stale" (last commit older than REFRESH_CYCLE, so a refresh is
+    due) or "unknown" (no commit time yet). The one definition of staleness,
+    shared by the refresh loop and /healthz.
+    """
+    last_commit = last_commit_times.get(zone)
+    if last_commit is None:
+        return "unknown"
+    now = now or datetime.now(timezone.utc)
+    return "stale" if now - last_commit > REFRESH_CYCLE else "fresh"
+
+
+def _retry_at(zone: str):
+    """When a zone whose last refresh failed may be retried (None if it didn't fail)."""
+    state = zone_states[zone]
+    if not state["failures"]:
+        return None
+    delay = min(CHECK_RETRY_SECONDS * 2 ** (state["failures"] - 1), MAX_RETRY_SECONDS)
+    return state["last_error"] + timedelta(seconds=delay)
+
+
+def request_refresh(session, zone: str) -> asyncio.Task:
+    """Start a background refresh of `zone`, or return the one already running."""
+    task = _refresh_tasks.get(zone)
+    if task is not None and not task.done():
+        return task
+    task = asyncio.create_task(_supervised_refresh(session, zone))
+    _refresh_tasks[zone] = task
+    return task
 
 
 async def check_and_refresh_on_startup(session):
@@ -166,38 +341,94 @@ async def check_and_refresh_on_startup(session):
     Checks if token files exist on GitHub for each zone.
     If a file is missing, it triggers a refresh for that specific zone.
     """
-    for zone in ZONES:
-        token_path = f"tokens/token_{zone}.json"
-        if not await github_file_exists(session, token_path):
+    exists = await asyncio.gather(
+        *(github_file_exists(session, f"tokens/token_{zone}.json") for zone in ZONES),
+        return_exceptions=True,
+    )
+    for zone, found in zip(ZONES, exists):
+        if found is True:
+            notify_discord(f"✅ Token file found for `{zone}`. Skipping initial refresh.")
+        else:
             notify_discord("`                                     `")
             notify_discord(f"⚠️ No token file found for `{zone}`. Generating now...")
-            await refresh_zone(session, zone)
-        else:
-            notify_discord(f"✅ Token file found for `{zone}`. Skipping initial refresh.")
+            request_refresh(session, zone)
 
 
 async def check_token_validity(session):
+    """
+    Refresh zones as their tokens go stale.
 
+    Staleness comes from last_commit_times, which refresh_zone keeps up to
+    date. GitHub is only asked (conditionally) when a zone's time is unknown
+    or has just expired locally, and the loop sleeps until the next expiry.
+    """
     while True:
-        for zone in ZONES:
-            token_path = f"tokens/token_{zone}.json"
-            commit_dt = await get_github_file_commit_info(session, REPO_TOKENS, token_path)
+        _schedule_changed.clear()
+        now = datetime.now(timezone.utc)
+
+        idle = [zone for zone in ZONES if zone_states[zone]["state"] == "idle"]
+        to_verify = [zone for zone in idle if zone_freshness(zone, now) != "fresh"]
+        verified = await asyncio.gather(
+            *(get_github_file_commit_info(session, zone) for zone in to_verify),
+            return_exceptions=True,
+        )
+        unknown = {zone for zone, dt in zip(to_verify, verified) if not isinstance(dt, datetime)}
+
+        next_check = None
+        for zone in idle:
+            retry_at = _retry_at(zone)
+            if zone in unknown:
+                due = now + timedelta(seconds=CHECK_RETRY_SECONDS)
+            elif retry_at is not None and now < retry_at:
+                # Stale, but the last refresh failed: wait out the backoff
+                due = retry_at
+            elif zone_freshness(zone, now) == "stale":
+                notify_discord("`                                     `")
+                notify_discord(f"⚠️ Tokens `{zone}` expired. Refreshing...")
+                request_refresh(session, zone)
+                continue
+            else:
+                due = last_commit_times[zone] + REFRESH_CYCLE
+            next_check = due if next_check is None else min(next_check, due)
+
+        # Sleep until the next expiry, or until a refresh finishes
+        timeout = None if next_check is None else max((next_check - now).total_seconds(), 1)
+        try:
+            await asyncio.wait_for(_schedule_changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _supervise(session):
+    try:
+        await check_and_refresh_on_startup(session)
+    except Exception as e:
+        notify_discord(f"❌ Startup token check failed: {e}")
+    await check_token_validity(session)
 
-            if commit_dt:
-                time_diff = datetime.now(timezone.utc) - commit_dt
 
-                is_stale = time_diff > timedelta(hours=STALE_TOKEN_HOURS)
-                if is_stale:
-                    notify_discord("`                                     `")
-                    notify_discord(f"⚠️ Tokens `{zone}` expired. Refreshing...")
-                    await refresh_zone(session, zone)
+def start_token_supervisor(session) -> asyncio.Task:
+    """Run the startup check and the validity loop in the background (idempotent)."""
+    global _supervisor_task
+    if _supervisor_task is None or _supervisor_task.done():
+        _supervisor_task = asyncio.create_task(_supervise(session))
+    return _supervisor_task
 
 
-        await asyncio.sleep(60)  
+async def stop_token_supervisor():
+    tasks = [t for t in [_supervisor_task, *_refresh_tasks.values()] if t is not None and not t.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 
 async def github_file_exists(session, filename: str) -> bool:
-    url = f"https://api.github.com/repos/{REPO_TOKENS}/contents/{filename}"
-    async with session.get(url, headers=HEADERS) as response:
-        return response.status == 200
+    url = f"{GITHUB_API}/repos/{REPO_TOKENS}/contents/{filename}"
+    async with session.get(url, headers=HEADERS, timeout=GITHUB_TIMEOUT) as response:
+        metrics.record_github(response, "contents")
+        if response.status != 200:
+            return False
+        # Keep the SHA so the first refresh doesn't need to ask again
+        _remote_blob_shas[filename] = (await response.json()).get('sha')
+        return True
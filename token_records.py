@@ -0,0 +1,90 @@
+# token_records.py
+import json
+import math
+import os
+from base64 import urlsafe_b64decode
+
+TOKEN_STATE_DIR = "token_state"
+# Used when a token doesn't carry its own expiry
+DEFAULT_TOKEN_LIFETIME_HOURS = float(os.getenv("TOKEN_LIFETIME_HOURS", "6"))
+
+
+def decode_token_expiry(token: str):
+    """Return the `exp` claim of a JWT as a unix timestamp, or None."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(urlsafe_b64decode(parts[1] + "=" * (-len(parts[1]) % 4)))
+        exp = payload.get("exp")
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+class TokenRecords:
+    """
+    Per-account token records of one zone, persisted in
+    token_state/records_{zone}.json as
+    {uid: {"token", "issued_at", "expires_at", "failures"}}.
+    """
+
+    def __init__(self, zone: str, state_dir: str = TOKEN_STATE_DIR):
+        self.zone = zone
+        self.path = os.path.join(state_dir, f"records_{zone}.json")
+        self.records = self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                print(f"WARNING: '{self.path}' is corrupt. All `{self.zone}` tokens will be regenerated.")
+        return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_file = self.path + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(self.records, f, indent=2)
+        os.replace(temp_file, self.path)
+
+    def due(self, accounts, now: float, horizon: float, slices: int):
+        """
+        Accounts to re-authenticate this cycle: every account whose token is
+        missing or expires within `horizon` seconds, topped up with the oldest
+        remaining ones to a 1/`slices` share of the zone. Re-issuing a steady
+        slice each cycle staggers issue times, spreading the auth load.
+        """
+        expiring, others = [], []
+        for acc in accounts:
+            record = self.records.get(str(acc["uid"]))
+            if record is None or not record.get("token") or record["expires_at"] - now < horizon:
+                expiring.append(acc)
+            else:
+                others.append(acc)
+
+        slice_size = math.ceil(len(accounts) / max(slices, 1))
+        others.sort(key=lambda acc: self.records[str(acc["uid"])]["issued_at"])
+        return expiring + others[:max(slice_size - len(expiring), 0)]
+
+    def record_success(self, uid, token: str, now: float):
+        expires_at = decode_token_expiry(token) or now + DEFAULT_TOKEN_LIFETIME_HOURS * 3600
+        self.records[str(uid)] = {"token": token, "issued_at": now, "expires_at": expires_at, "failures": 0}
+
+    def record_failure(self, uid):
+        # Keep the previous token: it may still be valid for a while
+        record = self.records.setdefault(
+            str(uid), {"token": None, "issued_at": 0, "expires_at": 0, "failures": 0}
+        )
+        record["failures"] += 1
+
+    def valid_tokens(self, accounts, now: float):
+        """Unexpired tokens, in config order."""
+        tokens = []
+        for acc in accounts:
+            record = self.records.get(str(acc["uid"]))
+            if record and record.get("token") and record["expires_at"] > now:
+                tokens.append(record["token"])
+        return tokens